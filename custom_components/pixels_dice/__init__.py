@@ -1,19 +1,57 @@
 """The Pixels Dice integration."""
 from __future__ import annotations
 
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
 import logging
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
-
-from .const import DOMAIN, CONF_WEBHOOK_ID, DEFAULT_WEBHOOK_ID
-from .webhook import async_setup_webhook, async_unload_webhook
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.typing import ConfigType
+
+from .const import (
+    DOMAIN,
+    CONF_DORMANT_AFTER_HOURS,
+    CONF_MAX_LIVE_DICE,
+    CONF_PATTERNS,
+    CONF_RELAY_NODE_ID,
+    CONF_RELAY_PEERS,
+    CONF_WEBHOOK_ID,
+    DEFAULT_DORMANT_AFTER_HOURS,
+    DEFAULT_MAX_LIVE_DICE,
+    DEFAULT_WEBHOOK_ID,
+    EVICTION_SWEEP_INTERVAL_MINUTES,
+)
+from .battery import BatteryForecasts
+from .eviction import DormantDiceTracker
+from .patterns import compile_patterns
+from .relay import RollRelay
+from .services import async_setup_services
+from .webhook import async_evict_dice, async_setup_webhook, async_unload_webhook
 
 _LOGGER = logging.getLogger(__name__)
 
 PLATFORMS: list[Platform] = [Platform.SENSOR]
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the Pixels Dice services.
+
+    Args:
+        hass: The Home Assistant instance.
+        config: The Home Assistant configuration.
+
+    Returns:
+        True if setup was successful.
+    """
+    async_setup_services(hass)
+    return True
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Pixels Dice from a config entry.
@@ -26,7 +64,39 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         True if setup was successful.
     """
     hass.data.setdefault(DOMAIN, {})
-    hass.data[DOMAIN][entry.entry_id] = {}
+    tracker = DormantDiceTracker(
+        max_live=entry.options.get(CONF_MAX_LIVE_DICE, DEFAULT_MAX_LIVE_DICE),
+        dormant_after=entry.options.get(
+            CONF_DORMANT_AFTER_HOURS, DEFAULT_DORMANT_AFTER_HOURS
+        )
+        * 3600,
+    )
+    entry_data: dict = {
+        "tracker": tracker,
+        "patterns": compile_patterns(entry.options.get(CONF_PATTERNS, [])),
+        "battery": BatteryForecasts(),
+        "roll_issues": defaultdict(Counter),
+    }
+    hass.data[DOMAIN][entry.entry_id] = entry_data
+
+    if peers := entry.options.get(CONF_RELAY_PEERS):
+        relay = RollRelay(hass, entry.options[CONF_RELAY_NODE_ID], peers)
+        entry_data["relay"] = relay
+        entry.async_on_unload(relay.async_shutdown)
+
+    @callback
+    def _async_sweep_dormant_dice(now: datetime) -> None:
+        """Evict dice that have not rolled within the dormancy age."""
+        async_evict_dice(hass, entry_data, tracker.expired())
+
+    entry.async_on_unload(
+        async_track_time_interval(
+            hass,
+            _async_sweep_dormant_dice,
+            timedelta(minutes=EVICTION_SWEEP_INTERVAL_MINUTES),
+        )
+    )
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
 
     # Get webhook ID from config (with fallback for existing entries)
     webhook_id = entry.data.get(CONF_WEBHOOK_ID, DEFAULT_WEBHOOK_ID)
@@ -64,3 +134,13 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         hass.data[DOMAIN].pop(entry.entry_id)
 
     return unload_ok
+
+
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the config entry when its options change.
+
+    Args:
+        hass: The Home Assistant instance.
+        entry: The config entry whose options were updated.
+    """
+    await hass.config_entries.async_reload(entry.entry_id)
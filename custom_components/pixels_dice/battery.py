@@ -0,0 +1,190 @@
+"""Battery drain forecasting for Pixels Dice."""
+from __future__ import annotations
+
+from bisect import bisect_left, insort
+from collections import deque
+
+# Number of (timestamp, battery level) samples kept per die
+FORECAST_WINDOW = 64
+
+# Minimum seconds between kept samples. Dice report their battery with every
+# roll, and a burst of rolls would otherwise fill the window with minutes of
+# near-identical, 1%-quantized levels instead of a meaningful drain period
+FORECAST_SAMPLE_INTERVAL = 300.0
+
+# Fewer samples than this give too noisy a slope to forecast from
+FORECAST_MIN_SAMPLES = 4
+
+# Forecasts further out than this are treated as "not draining"
+FORECAST_HORIZON = 365 * 24 * 3600
+
+# A rise in battery level larger than this means the die was charged, and
+# samples from before the charge no longer describe its drain
+CHARGE_RESET_DELTA = 0.02
+
+
+class BatteryForecaster:
+    """Least-squares fit of battery level over time for a single die.
+
+    The fit is kept as running sums over a bounded window of samples, so
+    adding a sample and reading the forecast are both O(1). Samples closer
+    than FORECAST_SAMPLE_INTERVAL to the last kept one are skipped, so the
+    window spans hours rather than one burst of rolls. Times are stored
+    relative to the first sample since the last reset to keep the sums well
+    conditioned.
+    """
+
+    __slots__ = ("_origin", "_samples", "_sum_t", "_sum_b", "_sum_tt", "_sum_tb")
+
+    def __init__(self) -> None:
+        """Initialize an empty forecaster."""
+        self._samples: deque[tuple[float, float]] = deque(maxlen=FORECAST_WINDOW)
+        self._reset()
+
+    def _reset(self) -> None:
+        """Forget every sample."""
+        self._origin: float | None = None
+        self._samples.clear()
+        self._sum_t = self._sum_b = self._sum_tt = self._sum_tb = 0.0
+
+    def add(self, timestamp: float, level: float) -> None:
+        """Add a battery sample, unless it follows the last one too closely.
+
+        A charge is still detected from a skipped sample.
+
+        Args:
+            timestamp: POSIX timestamp of the sample.
+            level: Battery level between 0.0 and 1.0.
+        """
+        samples = self._samples
+        if samples and level - samples[-1][1] > CHARGE_RESET_DELTA:
+            self._reset()
+        if self._origin is None:
+            self._origin = timestamp
+        elif timestamp - self._origin - samples[-1][0] < FORECAST_SAMPLE_INTERVAL:
+            return
+
+        if len(samples) == FORECAST_WINDOW:
+            old_t, old_b = samples[0]
+            self._sum_t -= old_t
+            self._sum_b -= old_b
+            self._sum_tt -= old_t * old_t
+            self._sum_tb -= old_t * old_b
+
+        t = timestamp - self._origin
+        samples.append((t, level))
+        self._sum_t += t
+        self._sum_b += level
+        self._sum_tt += t * t
+        self._sum_tb += t * level
+
+    def depleted_at(self) -> float | None:
+        """Return when the battery is expected to be empty.
+
+        Returns:
+            POSIX timestamp at which the fitted line reaches zero, or None if
+            there are too few samples or the battery is not noticeably
+            draining.
+        """
+        n = len(self._samples)
+        if n < FORECAST_MIN_SAMPLES or self._origin is None:
+            return None
+        denominator = n * self._sum_tt - self._sum_t * self._sum_t
+        if denominator <= 0:
+            return None
+        slope = (n * self._sum_tb - self._sum_t * self._sum_b) / denominator
+        if slope >= 0:
+            return None
+        mean_t = self._sum_t / n
+        mean_b = self._sum_b / n
+        depleted_at = mean_t - mean_b / slope
+        if depleted_at - self._samples[-1][0] > FORECAST_HORIZON:
+            return None
+        return self._origin + depleted_at
+
+
+class BatteryRanking:
+    """Dice ordered by expected depletion time, soonest first.
+
+    The order is maintained on every update with binary search instead of
+    being sorted again whenever it is read.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty ranking."""
+        self._ordered: list[tuple[float, int]] = []
+        self._keys: dict[int, tuple[float, int]] = {}
+
+    def __len__(self) -> int:
+        """Return the number of ranked dice."""
+        return len(self._ordered)
+
+    def update(self, pixel_id: int, depleted_at: float | None) -> None:
+        """Move a die to its new place, or drop it without a forecast.
+
+        Args:
+            pixel_id: The die whose forecast changed.
+            depleted_at: The new forecast, or None if there is none.
+        """
+        old_key = self._keys.pop(pixel_id, None)
+        if old_key is not None:
+            del self._ordered[bisect_left(self._ordered, old_key)]
+        if depleted_at is not None:
+            key = (depleted_at, pixel_id)
+            self._keys[pixel_id] = key
+            insort(self._ordered, key)
+
+    def ranked(self, limit: int | None = None) -> list[tuple[int, float]]:
+        """Return dice by expected depletion, soonest first.
+
+        Args:
+            limit: Maximum number of dice to return, all if None.
+
+        Returns:
+            (pixel ID, depletion timestamp) pairs.
+        """
+        return [
+            (pixel_id, depleted_at)
+            for depleted_at, pixel_id in self._ordered[:limit]
+        ]
+
+
+class BatteryForecasts:
+    """Battery forecasters for every live die plus their ranking."""
+
+    def __init__(self) -> None:
+        """Initialize without any dice."""
+        self._forecasters: dict[int, BatteryForecaster] = {}
+        self.ranking = BatteryRanking()
+
+    def update(self, pixel_id: int, timestamp: float, level: float) -> float | None:
+        """Add a battery sample for a die and re-rank it.
+
+        Samples at or below zero are ignored, since they are what the
+        webhook reports when a die sends no battery level.
+
+        Args:
+            pixel_id: The die that reported.
+            timestamp: POSIX timestamp of the sample.
+            level: Battery level between 0.0 and 1.0.
+
+        Returns:
+            The die's expected depletion timestamp, or None.
+        """
+        forecaster = self._forecasters.get(pixel_id)
+        if forecaster is None:
+            forecaster = self._forecasters[pixel_id] = BatteryForecaster()
+        if level > 0:
+            forecaster.add(timestamp, level)
+        depleted_at = forecaster.depleted_at()
+        self.ranking.update(pixel_id, depleted_at)
+        return depleted_at
+
+    def forget(self, pixel_id: int) -> None:
+        """Drop the forecast of a die.
+
+        Args:
+            pixel_id: The die to forget.
+        """
+        self._forecasters.pop(pixel_id, None)
+        self.ranking.update(pixel_id, None)
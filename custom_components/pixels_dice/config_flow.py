@@ -5,13 +5,50 @@ from typing import Any
 
 import voluptuous as vol
 
-from homeassistant.config_entries import ConfigFlow, ConfigFlowResult
+from homeassistant.config_entries import (
+    ConfigEntry,
+    ConfigFlow,
+    ConfigFlowResult,
+    OptionsFlow,
+)
+from homeassistant.core import callback
+from homeassistant.helpers import selector
 from homeassistant.helpers.network import get_url
 
-from .const import DOMAIN, CONF_WEBHOOK_ID, DEFAULT_WEBHOOK_ID
+from .const import (
+    DOMAIN,
+    CONF_DORMANT_AFTER_HOURS,
+    CONF_MAX_LIVE_DICE,
+    CONF_PATTERNS,
+    CONF_RELAY_NODE_ID,
+    CONF_RELAY_PEERS,
+    CONF_WEBHOOK_ID,
+    DEFAULT_DORMANT_AFTER_HOURS,
+    DEFAULT_MAX_LIVE_DICE,
+    DEFAULT_WEBHOOK_ID,
+)
+from .patterns import PATTERNS_SCHEMA
 
 VERSION = 1
 
+RELAY_PEERS_SCHEMA = vol.Schema({str: vol.Url()})
+
+
+def _check_relay(node_id: str, peers: dict[str, str]) -> None:
+    """Check that relay peers are usable with this node's name.
+
+    Args:
+        node_id: Name of this node on the hash ring.
+        peers: Webhook URL of every other node, by node name.
+
+    Raises:
+        vol.Invalid: If the peers are malformed, or this node is unnamed or
+            listed among its own peers.
+    """
+    RELAY_PEERS_SCHEMA(peers)
+    if peers and (not node_id or node_id in peers):
+        raise vol.Invalid("relay peers need a node ID not used by any peer")
+
 
 class PixelsDiceConfigFlow(ConfigFlow, domain=DOMAIN):
     """Handle a config flow for Pixels Dice."""
@@ -22,6 +59,19 @@ class PixelsDiceConfigFlow(ConfigFlow, domain=DOMAIN):
         """Initialize the config flow."""
         self._webhook_id: str = DEFAULT_WEBHOOK_ID
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry) -> OptionsFlow:
+        """Return the options flow for this handler.
+
+        Args:
+            config_entry: The config entry the options belong to.
+
+        Returns:
+            The options flow instance.
+        """
+        return PixelsDiceOptionsFlow()
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> ConfigFlowResult:
@@ -81,3 +131,66 @@ class PixelsDiceConfigFlow(ConfigFlow, domain=DOMAIN):
                 "webhook_id": self._webhook_id,
             },
         )
+
+
+class PixelsDiceOptionsFlow(OptionsFlow):
+    """Handle Pixels Dice options."""
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Manage the dormant dice limits, roll patterns and relay peers.
+
+        Args:
+            user_input: User-submitted form data, or None on first display.
+
+        Returns:
+            A ConfigFlowResult that shows the form or saves the options.
+        """
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            try:
+                PATTERNS_SCHEMA(user_input.get(CONF_PATTERNS, []))
+            except vol.Invalid:
+                errors[CONF_PATTERNS] = "invalid_patterns"
+            try:
+                _check_relay(
+                    user_input.get(CONF_RELAY_NODE_ID, ""),
+                    user_input.get(CONF_RELAY_PEERS, {}),
+                )
+            except vol.Invalid:
+                errors[CONF_RELAY_PEERS] = "invalid_relay"
+            if not errors:
+                return self.async_create_entry(data=user_input)
+
+        options = user_input or self.config_entry.options
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(
+                        CONF_MAX_LIVE_DICE,
+                        default=options.get(CONF_MAX_LIVE_DICE, DEFAULT_MAX_LIVE_DICE),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                    vol.Optional(
+                        CONF_DORMANT_AFTER_HOURS,
+                        default=options.get(
+                            CONF_DORMANT_AFTER_HOURS, DEFAULT_DORMANT_AFTER_HOURS
+                        ),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+                    vol.Optional(
+                        CONF_PATTERNS,
+                        default=options.get(CONF_PATTERNS, []),
+                    ): selector.ObjectSelector(),
+                    vol.Optional(
+                        CONF_RELAY_NODE_ID,
+                        default=options.get(CONF_RELAY_NODE_ID, ""),
+                    ): str,
+                    vol.Optional(
+                        CONF_RELAY_PEERS,
+                        default=options.get(CONF_RELAY_PEERS, {}),
+                    ): selector.ObjectSelector(),
+                }
+            ),
+            errors=errors,
+        )
@@ -4,3 +4,31 @@ DOMAIN = "pixels_dice"
 
 CONF_WEBHOOK_ID = "webhook_id"
 DEFAULT_WEBHOOK_ID = "pixels_dice"
+
+CONF_MAX_LIVE_DICE = "max_live_dice"
+CONF_DORMANT_AFTER_HOURS = "dormant_after_hours"
+DEFAULT_MAX_LIVE_DICE = 1000
+DEFAULT_DORMANT_AFTER_HOURS = 0
+
+# How often dice that exceeded the dormancy age are swept from memory
+EVICTION_SWEEP_INTERVAL_MINUTES = 5
+
+CONF_PATTERNS = "patterns"
+
+EVENT_PATTERN = f"{DOMAIN}_pattern"
+
+SERVICE_START_SESSION = "start_session"
+SERVICE_STOP_SESSION = "stop_session"
+SERVICE_GET_BATTERY_FORECAST = "get_battery_forecast"
+
+ATTR_NAME = "name"
+ATTR_PLAYERS = "players"
+ATTR_EXPORT = "export"
+EXPORT_NONE = "none"
+ATTR_LIMIT = "limit"
+
+CONF_RELAY_NODE_ID = "relay_node_id"
+CONF_RELAY_PEERS = "relay_peers"
+
+# Header marking a request forwarded by a peer, so it is never forwarded again
+RELAY_HEADER = "X-Pixels-Dice-Relay"
@@ -0,0 +1,42 @@
+"""Diagnostics support for Pixels Dice."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, CONF_RELAY_PEERS
+
+# Peer webhook URLs let anyone who knows them post rolls
+TO_REDACT = {CONF_RELAY_PEERS}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry.
+
+    Args:
+        hass: The Home Assistant instance.
+        entry: The config entry to diagnose.
+
+    Returns:
+        The entry's options with relay peer URLs redacted, in-memory dice
+        counts, relay statistics and per-die roll issues.
+    """
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    session = entry_data.get("session")
+    relay = entry_data.get("relay")
+    return {
+        "options": async_redact_data(entry.options, TO_REDACT),
+        "live_dice": len(entry_data.get("entities", {})),
+        "battery_forecasts": len(entry_data["battery"].ranking),
+        "session_rolls": len(session) if session is not None else None,
+        "relay": relay.stats() if relay is not None else None,
+        "roll_issues": {
+            str(pixel_id): dict(issues)
+            for pixel_id, issues in entry_data.get("roll_issues", {}).items()
+        },
+    }
@@ -0,0 +1,88 @@
+"""Die type tables for Pixels Dice.
+
+The tables are built once at import so validating a roll is a couple of
+dictionary and set lookups.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+DEFAULT_DIE_TYPE = "d20"
+
+ROLL_FACE_OUT_OF_RANGE = "face_out_of_range"
+ROLL_LED_COUNT_MISMATCH = "led_count_mismatch"
+
+
+@dataclass(frozen=True, slots=True)
+class DieTypeSpec:
+    """What a die of a given type can report."""
+
+    name: str
+    faces: frozenset[int]
+    led_count: int
+    crit_face: int | None
+
+
+DIE_TYPES: dict[str, DieTypeSpec] = {
+    spec.name: spec
+    for spec in (
+        DieTypeSpec("d4", frozenset(range(1, 5)), 4, 4),
+        DieTypeSpec("d6", frozenset(range(1, 7)), 6, 6),
+        # Pipped d6 light every pip individually
+        DieTypeSpec("d6pipped", frozenset(range(1, 7)), 21, 6),
+        DieTypeSpec("d6fudge", frozenset((-1, 0, 1)), 6, None),
+        DieTypeSpec("d8", frozenset(range(1, 9)), 8, 8),
+        # The "0" face of a d10 is reported as 0 or 10 depending on the app
+        DieTypeSpec("d10", frozenset(range(0, 11)), 10, 10),
+        # Percentile dice report tens, with "00" as 0 or 100
+        DieTypeSpec("d00", frozenset(range(0, 101, 10)), 10, None),
+        # Some apps call the percentile die a d100 and report either its tens
+        # face or the combined percentile result, so any whole 0-100 is valid
+        DieTypeSpec("d100", frozenset(range(0, 101)), 10, None),
+        DieTypeSpec("d12", frozenset(range(1, 13)), 12, 12),
+        DieTypeSpec("d20", frozenset(range(1, 21)), 20, 20),
+    )
+}
+
+# Die types sharing a LED count can't be told apart; the first one listed
+# wins, so 6 LEDs infers a regular d6 and 10 LEDs a d10
+DIE_TYPE_BY_LED_COUNT: dict[int, str] = {
+    spec.led_count: spec.name for spec in reversed(DIE_TYPES.values())
+}
+
+
+def infer_die_type(led_count: float) -> str:
+    """Guess a die's type from its LED count.
+
+    Args:
+        led_count: Number of LEDs reported by the die.
+
+    Returns:
+        The matching die type, or DEFAULT_DIE_TYPE if none matches.
+    """
+    return DIE_TYPE_BY_LED_COUNT.get(led_count, DEFAULT_DIE_TYPE)
+
+
+def check_roll(die_type: str, face_value: float, led_count: float) -> str | None:
+    """Check a roll against its die type's table.
+
+    Unknown die types can't be checked and always pass.
+
+    Args:
+        die_type: The die's type.
+        face_value: The rolled face value.
+        led_count: Number of LEDs reported by the die.
+
+    Returns:
+        ROLL_FACE_OUT_OF_RANGE if the face is impossible for the die type,
+        ROLL_LED_COUNT_MISMATCH if only the LED count is unexpected, or None
+        if the roll is plausible.
+    """
+    spec = DIE_TYPES.get(die_type)
+    if spec is None:
+        return None
+    if face_value not in spec.faces:
+        return ROLL_FACE_OUT_OF_RANGE
+    if led_count != spec.led_count:
+        return ROLL_LED_COUNT_MISMATCH
+    return None
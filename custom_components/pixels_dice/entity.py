@@ -1,12 +1,20 @@
 """Entity for Pixels Dice integration."""
 from __future__ import annotations
 
+from datetime import datetime
 from typing import Any
 
-from homeassistant.components.sensor import SensorEntity
-from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorStateClass,
+)
+from homeassistant.const import EntityCategory, UnitOfTime
+from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
+from homeassistant.util import dt as dt_util
 
 from .const import DOMAIN
+from .relay import RelayPeer
 
 
 class PixelsDiceEntity(SensorEntity):
@@ -104,3 +112,117 @@ class PixelsDiceEntity(SensorEntity):
         self._colorway = colorway
         self._battery_level = battery_level
         self.async_write_ha_state()
+
+
+class PixelsDiceBatteryForecastEntity(SensorEntity):
+    """Representation of a die's expected battery depletion time.
+
+    The state is the moment the die's battery is expected to run out, based
+    on how its battery level has been dropping, or unknown while there is no
+    usable trend.
+    """
+
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+    _attr_device_class = SensorDeviceClass.TIMESTAMP
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_name = "Battery empty at"
+
+    def __init__(self, pixel_id: int, depleted_at: float | None = None) -> None:
+        """Initialize the battery forecast entity.
+
+        Args:
+            pixel_id: Unique hardware identifier of the die.
+            depleted_at: Optional initial forecast as a POSIX timestamp.
+        """
+        self._attr_unique_id = f"{DOMAIN}_{pixel_id}_battery_empty_at"
+        self._attr_device_info = DeviceInfo(identifiers={(DOMAIN, str(pixel_id))})
+        self._attr_native_value = _forecast_to_datetime(depleted_at)
+
+    def update_forecast(self, depleted_at: float | None) -> None:
+        """Update the forecast, writing state only when it visibly changes.
+
+        Args:
+            depleted_at: The new forecast as a POSIX timestamp, or None.
+        """
+        value = _forecast_to_datetime(depleted_at)
+        if value == self._attr_native_value:
+            return
+        self._attr_native_value = value
+        self.async_write_ha_state()
+
+
+def _forecast_to_datetime(depleted_at: float | None) -> datetime | None:
+    """Convert a forecast timestamp to a datetime rounded to the minute."""
+    if depleted_at is None:
+        return None
+    return dt_util.utc_from_timestamp(depleted_at // 60 * 60)
+
+
+class PixelsDiceRelayPeerEntity(SensorEntity):
+    """Base for sensors reporting on forwarding to a relay peer.
+
+    The peer's statistics are kept in memory by the relay, so these sensors
+    simply poll them.
+    """
+
+    _attr_has_entity_name = True
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(self, peer: RelayPeer, key: str) -> None:
+        """Initialize the relay peer sensor.
+
+        Args:
+            peer: The peer to report on.
+            key: Suffix making the unique ID specific to the statistic.
+        """
+        self._peer = peer
+        self._attr_unique_id = f"{DOMAIN}_relay_{peer.name}_{key}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, f"relay_{peer.name}")},
+            name=f"Relay peer {peer.name}",
+            manufacturer="Pixels",
+            model="Relay peer",
+            entry_type=DeviceEntryType.SERVICE,
+        )
+
+
+class PixelsDiceRelayQueueDepthEntity(PixelsDiceRelayPeerEntity):
+    """Number of rolls waiting to be forwarded to a relay peer."""
+
+    _attr_name = "Queue depth"
+
+    def __init__(self, peer: RelayPeer) -> None:
+        """Initialize the queue depth sensor.
+
+        Args:
+            peer: The peer to report on.
+        """
+        super().__init__(peer, "queue_depth")
+
+    async def async_update(self) -> None:
+        """Read the current queue depth."""
+        self._attr_native_value = len(self._peer.queue)
+
+
+class PixelsDiceRelayLatencyEntity(PixelsDiceRelayPeerEntity):
+    """Average time a relay peer takes to accept forwarded rolls."""
+
+    _attr_name = "Forwarding latency"
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_suggested_display_precision = 0
+
+    def __init__(self, peer: RelayPeer) -> None:
+        """Initialize the latency sensor.
+
+        Args:
+            peer: The peer to report on.
+        """
+        super().__init__(peer, "latency")
+
+    async def async_update(self) -> None:
+        """Read the current average latency."""
+        latency = self._peer.latency
+        self._attr_native_value = None if latency is None else latency * 1000
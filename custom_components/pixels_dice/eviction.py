@@ -0,0 +1,89 @@
+"""Eviction of dormant dice from the in-memory entity map."""
+from __future__ import annotations
+
+from collections import OrderedDict
+import time
+
+
+class DormantDiceTracker:
+    """Track when each live die was last seen and pick dice to evict.
+
+    Dice are kept in least-recently-seen order so both the LRU limit and the
+    dormancy age can be enforced by popping from the front, which keeps every
+    operation O(1) amortized per roll. The tracker only decides *which* dice
+    to evict; suspending the entity is left to the caller.
+    """
+
+    def __init__(self, max_live: int, dormant_after: float) -> None:
+        """Initialize the tracker.
+
+        Args:
+            max_live: Maximum number of dice kept in memory, 0 for no limit.
+            dormant_after: Seconds after which an unseen die is evicted,
+                0 to disable age-based eviction.
+        """
+        self._max_live = max_live
+        self._dormant_after = dormant_after
+        self._last_seen: OrderedDict[int, float] = OrderedDict()
+
+    def __len__(self) -> int:
+        """Return the number of dice currently tracked as live."""
+        return len(self._last_seen)
+
+    def __contains__(self, pixel_id: object) -> bool:
+        """Return whether a die is currently tracked as live."""
+        return pixel_id in self._last_seen
+
+    def touch(self, pixel_id: int, now: float | None = None) -> list[int]:
+        """Record a roll for a die and return dice that must now be evicted.
+
+        Args:
+            pixel_id: The die that was just seen.
+            now: Monotonic timestamp of the roll, defaults to the current time.
+
+        Returns:
+            Pixel IDs to evict, least recently seen first. Never contains
+            ``pixel_id`` itself.
+        """
+        if now is None:
+            now = time.monotonic()
+        self._last_seen[pixel_id] = now
+        self._last_seen.move_to_end(pixel_id)
+
+        evicted = self.expired(now)
+        if self._max_live:
+            while len(self._last_seen) > self._max_live:
+                evicted.append(self._last_seen.popitem(last=False)[0])
+        return evicted
+
+    def expired(self, now: float | None = None) -> list[int]:
+        """Pop and return every die unseen for longer than the dormancy age.
+
+        Args:
+            now: Monotonic timestamp to compare against, defaults to now.
+
+        Returns:
+            Pixel IDs that exceeded the dormancy age, oldest first.
+        """
+        evicted: list[int] = []
+        if not self._dormant_after:
+            return evicted
+        if now is None:
+            now = time.monotonic()
+
+        cutoff = now - self._dormant_after
+        while self._last_seen:
+            pixel_id, last_seen = next(iter(self._last_seen.items()))
+            if last_seen >= cutoff:
+                break
+            del self._last_seen[pixel_id]
+            evicted.append(pixel_id)
+        return evicted
+
+    def discard(self, pixel_id: int) -> None:
+        """Stop tracking a die without evicting it.
+
+        Args:
+            pixel_id: The die to forget.
+        """
+        self._last_seen.pop(pixel_id, None)
@@ -0,0 +1,233 @@
+"""Streaming roll-pattern detection for Pixels Dice."""
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from functools import partial
+import operator
+from typing import Any
+
+import voluptuous as vol
+
+PATTERN_STREAK = "streak"
+PATTERN_RUN = "run"
+PATTERN_WINDOW_SUM = "window_sum"
+PATTERN_TYPES = (PATTERN_STREAK, PATTERN_RUN, PATTERN_WINDOW_SUM)
+
+
+def _check_pattern(config: dict[str, Any]) -> dict[str, Any]:
+    """Check that a pattern has the comparison its type needs.
+
+    Args:
+        config: A pattern that already passed the base schema.
+
+    Returns:
+        The unchanged pattern.
+
+    Raises:
+        vol.Invalid: If the comparison keys don't match the pattern type.
+    """
+    if config["type"] == PATTERN_STREAK:
+        if "value" not in config:
+            raise vol.Invalid("streak patterns require a value")
+    elif ("above" in config) == ("below" in config):
+        raise vol.Invalid(f"{config['type']} patterns require either above or below")
+    return config
+
+
+PATTERN_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Required("name"): str,
+            vol.Required("type"): vol.In(PATTERN_TYPES),
+            vol.Required("length"): vol.All(vol.Coerce(int), vol.Range(min=1)),
+            vol.Optional("value"): vol.Coerce(float),
+            vol.Optional("above"): vol.Coerce(float),
+            vol.Optional("below"): vol.Coerce(float),
+            vol.Optional("die_type"): str,
+            vol.Optional("pixel_id"): vol.Coerce(int),
+        }
+    ),
+    _check_pattern,
+)
+PATTERNS_SCHEMA = vol.Schema([PATTERN_SCHEMA])
+
+
+@dataclass(frozen=True, slots=True)
+class PatternRule:
+    """A compiled pattern.
+
+    For streaks and runs ``test`` decides whether a single roll extends the
+    sequence; for sliding-window sums it is applied to the window total.
+    """
+
+    name: str
+    type: str
+    length: int
+    test: Callable[[float], bool] = field(compare=False)
+    die_type: str | None = None
+    pixel_id: int | None = None
+
+    @classmethod
+    def from_config(cls, config: dict[str, Any]) -> PatternRule:
+        """Compile a validated pattern configuration.
+
+        Args:
+            config: A pattern that passed PATTERN_SCHEMA.
+
+        Returns:
+            The compiled rule.
+        """
+        # partial(lt, bound)(value) is bound < value, i.e. value > bound
+        if config["type"] == PATTERN_STREAK:
+            test = partial(operator.eq, config["value"])
+        elif "above" in config:
+            test = partial(operator.lt, config["above"])
+        else:
+            test = partial(operator.gt, config["below"])
+        return cls(
+            name=config["name"],
+            type=config["type"],
+            length=config["length"],
+            test=test,
+            die_type=config.get("die_type"),
+            pixel_id=config.get("pixel_id"),
+        )
+
+
+class _RunMatcher:
+    """Per-die state for streak and run patterns: consecutive matching rolls."""
+
+    __slots__ = ("rule", "count")
+
+    def __init__(self, rule: PatternRule) -> None:
+        self.rule = rule
+        self.count = 0
+
+    def advance(self, value: float) -> bool:
+        if not self.rule.test(value):
+            self.count = 0
+            return False
+        self.count += 1
+        if self.count < self.rule.length:
+            return False
+        self.count = 0
+        return True
+
+
+class _WindowSumMatcher:
+    """Per-die state for sliding-window sums, kept as a running total."""
+
+    __slots__ = ("rule", "window", "total")
+
+    def __init__(self, rule: PatternRule) -> None:
+        self.rule = rule
+        self.window: deque[float] = deque(maxlen=rule.length)
+        self.total = 0.0
+
+    def advance(self, value: float) -> bool:
+        window = self.window
+        if len(window) == self.rule.length:
+            self.total -= window[0]
+        window.append(value)
+        self.total += value
+        if len(window) < self.rule.length or not self.rule.test(self.total):
+            return False
+        window.clear()
+        self.total = 0.0
+        return True
+
+
+_Matcher = _RunMatcher | _WindowSumMatcher
+
+
+class PatternEngine:
+    """Advance every applicable pattern by one roll per die.
+
+    Rules are indexed by pixel ID and die type up front, and each die gets its
+    own small set of matchers on its first roll, so a roll only touches the
+    rules that apply to that die and each matcher advances in O(1). A match
+    resets the matcher, so a streak of six natural 20s matches a
+    three-in-a-row rule twice.
+    """
+
+    def __init__(self, rules: list[PatternRule]) -> None:
+        """Initialize the engine.
+
+        Args:
+            rules: The compiled rules to detect.
+        """
+        self._global: list[PatternRule] = []
+        self._by_die_type: dict[str, list[PatternRule]] = {}
+        self._by_pixel_id: dict[int, list[PatternRule]] = {}
+        for rule in rules:
+            if rule.pixel_id is not None:
+                self._by_pixel_id.setdefault(rule.pixel_id, []).append(rule)
+            elif rule.die_type is not None:
+                self._by_die_type.setdefault(rule.die_type, []).append(rule)
+            else:
+                self._global.append(rule)
+        self._dice: dict[int, tuple[str, tuple[_Matcher, ...]]] = {}
+
+    def __bool__(self) -> bool:
+        """Return whether the engine has any rules at all."""
+        return bool(self._global or self._by_die_type or self._by_pixel_id)
+
+    def advance(self, pixel_id: int, die_type: str, value: float) -> list[PatternRule]:
+        """Feed a roll to the die's matchers.
+
+        Args:
+            pixel_id: The die that rolled.
+            die_type: The die's current type.
+            value: The rolled face value.
+
+        Returns:
+            The rules that matched on this roll.
+        """
+        state = self._dice.get(pixel_id)
+        if state is None or state[0] != die_type:
+            state = (die_type, self._build_matchers(pixel_id, die_type))
+            self._dice[pixel_id] = state
+        return [matcher.rule for matcher in state[1] if matcher.advance(value)]
+
+    def forget(self, pixel_id: int) -> None:
+        """Drop the matcher state of a die.
+
+        Args:
+            pixel_id: The die to forget.
+        """
+        self._dice.pop(pixel_id, None)
+
+    def _build_matchers(
+        self, pixel_id: int, die_type: str
+    ) -> tuple[_Matcher, ...]:
+        """Create fresh matchers for every rule that applies to a die."""
+        rules = (
+            self._by_pixel_id.get(pixel_id, [])
+            + self._by_die_type.get(die_type, [])
+            + self._global
+        )
+        return tuple(
+            _WindowSumMatcher(rule)
+            if rule.type == PATTERN_WINDOW_SUM
+            else _RunMatcher(rule)
+            for rule in rules
+        )
+
+
+def compile_patterns(config: list[dict[str, Any]]) -> PatternEngine:
+    """Validate pattern configuration and build an engine for it.
+
+    Args:
+        config: Raw pattern configurations, typically from entry options.
+
+    Returns:
+        A pattern engine for the given rules.
+
+    Raises:
+        vol.Invalid: If any pattern is invalid.
+    """
+    return PatternEngine(
+        [PatternRule.from_config(pattern) for pattern in PATTERNS_SCHEMA(config)]
+    )
@@ -0,0 +1,218 @@
+"""Payload decoding and validation for Pixels Dice webhooks."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+import json
+from typing import Any
+import zlib
+
+import msgpack
+
+from .die_types import infer_die_type
+
+GZIP_CONTENT_TYPES = frozenset({"application/gzip", "application/x-gzip"})
+DEFLATE_CONTENT_TYPES = frozenset(
+    {"application/zlib", "application/deflate", "application/x-deflate"}
+)
+MSGPACK_CONTENT_TYPES = frozenset(
+    {"application/msgpack", "application/x-msgpack", "application/vnd.msgpack"}
+)
+COMPACT_CONTENT_TYPES = (
+    GZIP_CONTENT_TYPES | DEFLATE_CONTENT_TYPES | MSGPACK_CONTENT_TYPES
+)
+
+# Upper bound on the size of a decompressed body, to defuse zip bombs
+MAX_DECOMPRESSED_SIZE = 1024 * 1024
+
+# Pixel IDs must fit the signed 64-bit columns of a recorded session
+PIXEL_ID_MIN = -(2**63)
+PIXEL_ID_MAX = 2**63 - 1
+
+
+class PayloadError(Exception):
+    """Raised when a webhook payload cannot be decoded or validated."""
+
+    def __init__(self, message: str, status: int = 400) -> None:
+        """Initialize the error.
+
+        Args:
+            message: Human readable reason, also used as the response body.
+            status: HTTP status code to answer the webhook with.
+        """
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass(frozen=True, slots=True)
+class RollRecord:
+    """A validated roll event, independent of the wire encoding."""
+
+    pixel_id: int
+    pixel_name: str
+    face_value: int | float
+    led_count: int | float
+    die_type: str
+    colorway: str
+    battery_level: float
+
+    def as_payload(self) -> dict[str, Any]:
+        """Return the record as a webhook event object.
+
+        Returns:
+            The event using the webhook's camelCase keys.
+        """
+        return {
+            "pixelId": self.pixel_id,
+            "pixelName": self.pixel_name,
+            "faceValue": self.face_value,
+            "ledCount": self.led_count,
+            "dieType": self.die_type,
+            "colorway": self.colorway,
+            "batteryLevel": self.battery_level,
+        }
+
+
+def decode_body(content_type: str, body: bytes) -> Any:
+    """Decode a compressed or MessagePack encoded webhook body.
+
+    Compressed bodies are expected to contain JSON.
+
+    Args:
+        content_type: The request Content-Type, one of COMPACT_CONTENT_TYPES.
+        body: The raw request body.
+
+    Returns:
+        The decoded payload object.
+
+    Raises:
+        PayloadError: If the body cannot be decoded.
+    """
+    if content_type in MSGPACK_CONTENT_TYPES:
+        try:
+            return msgpack.unpackb(body, raw=False)
+        except (ValueError, msgpack.UnpackException) as err:
+            raise PayloadError("Invalid MessagePack") from err
+
+    if content_type in GZIP_CONTENT_TYPES:
+        body = _bounded_decompress(body, 16 + zlib.MAX_WBITS)
+    else:
+        try:
+            body = _bounded_decompress(body, zlib.MAX_WBITS)
+        except PayloadError as err:
+            if err.status != 400:
+                raise
+            # Some clients send raw deflate streams without the zlib header
+            body = _bounded_decompress(body, -zlib.MAX_WBITS)
+
+    try:
+        return json.loads(body)
+    except (json.JSONDecodeError, UnicodeDecodeError) as err:
+        raise PayloadError("Invalid JSON") from err
+
+
+def _bounded_decompress(body: bytes, wbits: int) -> bytes:
+    """Decompress a body without ever inflating past MAX_DECOMPRESSED_SIZE.
+
+    Args:
+        body: The compressed bytes.
+        wbits: zlib window bits selecting the gzip, zlib or raw format.
+
+    Returns:
+        The decompressed bytes.
+
+    Raises:
+        PayloadError: If the body is corrupt, truncated or too large.
+    """
+    decompressor = zlib.decompressobj(wbits)
+    try:
+        data = decompressor.decompress(body, MAX_DECOMPRESSED_SIZE + 1)
+    except zlib.error as err:
+        raise PayloadError("Invalid compressed payload") from err
+    if len(data) > MAX_DECOMPRESSED_SIZE or decompressor.unconsumed_tail:
+        raise PayloadError("Decompressed payload too large", status=413)
+    if not decompressor.eof:
+        raise PayloadError("Invalid compressed payload")
+    return data
+
+
+def parse_rolls(data: Any) -> list[RollRecord]:
+    """Validate a single roll event or a batch of them.
+
+    Args:
+        data: A decoded payload, either one event object or a list of them.
+
+    Returns:
+        The validated roll records, in payload order.
+
+    Raises:
+        PayloadError: If the batch is empty or any event is invalid.
+    """
+    if isinstance(data, list):
+        if not data:
+            raise PayloadError("Empty batch")
+        return [parse_roll(item) for item in data]
+    return [parse_roll(data)]
+
+
+def parse_roll(data: Any) -> RollRecord:
+    """Validate a single roll event and apply defaults.
+
+    A missing die type is inferred from the LED count.
+
+    Args:
+        data: A decoded event object using the webhook's camelCase keys.
+
+    Returns:
+        The validated roll record.
+
+    Raises:
+        PayloadError: If required fields are missing or not numeric, the
+            pixel ID is not a 64-bit integer, or a text field is not a string.
+    """
+    if not isinstance(data, dict):
+        raise PayloadError("Payload must be an object")
+
+    # Validate required fields
+    if "pixelId" not in data:
+        raise PayloadError("Missing pixelId")
+    pixel_id = data["pixelId"]
+    if (
+        not isinstance(pixel_id, int)
+        or isinstance(pixel_id, bool)
+        or not PIXEL_ID_MIN <= pixel_id <= PIXEL_ID_MAX
+    ):
+        raise PayloadError("pixelId must be an integer")
+
+    face_value = data.get("faceValue")
+    led_count = data.get("ledCount")
+    battery_level = data.get("batteryLevel", 0.0)
+
+    if face_value is None or led_count is None:
+        raise PayloadError("Missing critical data")
+
+    # Validate numeric types
+    if not isinstance(face_value, (int, float)):
+        raise PayloadError("faceValue must be numeric")
+    if not isinstance(led_count, (int, float)):
+        raise PayloadError("ledCount must be numeric")
+    if not isinstance(battery_level, (int, float)):
+        raise PayloadError("batteryLevel must be numeric")
+    die_type = data.get("dieType")
+    if die_type is not None and not isinstance(die_type, str):
+        raise PayloadError("dieType must be a string")
+    pixel_name = data.get("pixelName", "Unknown Dice")
+    if not isinstance(pixel_name, str):
+        raise PayloadError("pixelName must be a string")
+    colorway = data.get("colorway", "default")
+    if not isinstance(colorway, str):
+        raise PayloadError("colorway must be a string")
+
+    return RollRecord(
+        pixel_id=pixel_id,
+        pixel_name=pixel_name,
+        face_value=face_value,
+        led_count=led_count,
+        die_type=die_type or infer_die_type(led_count),
+        colorway=colorway,
+        battery_level=battery_level,
+    )
@@ -0,0 +1,305 @@
+"""Relaying rolls between several Home Assistant instances."""
+from __future__ import annotations
+
+import asyncio
+from bisect import bisect
+from collections import deque
+from collections.abc import Iterable
+from contextlib import suppress
+import hashlib
+import logging
+import time
+from typing import Any
+
+from aiohttp import ClientError, ClientTimeout
+import msgpack
+
+from homeassistant.core import CALLBACK_TYPE, HassJob, HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.event import async_call_later
+
+from .const import RELAY_HEADER
+from .payload import RollRecord
+
+_LOGGER = logging.getLogger(__name__)
+
+# Points per node on the hash ring; more points spread dice more evenly
+RING_REPLICAS = 128
+
+# Rolls queued per peer before the oldest ones are dropped
+RELAY_MAX_QUEUE = 1000
+
+# Rolls sent to a peer in a single request
+RELAY_MAX_BATCH = 100
+
+RELAY_TIMEOUT = ClientTimeout(total=10)
+RELAY_MAX_BACKOFF = 60.0
+
+# Weight of the latest request in the moving average of forwarding latency
+LATENCY_SMOOTHING = 0.2
+
+
+def _hash(value: str) -> int:
+    """Return a hash of a string that is stable across processes."""
+    return int.from_bytes(
+        hashlib.blake2b(value.encode(), digest_size=8).digest(), "big"
+    )
+
+
+class HashRing:
+    """Consistent hash ring assigning dice to nodes.
+
+    Every node is placed on the ring at RING_REPLICAS points and a die
+    belongs to the node at the first point after the die's hash. Adding a
+    node only moves the dice that now fall just before its points, about
+    1/N of them, and every node computes the same assignment as long as it
+    is configured with the same node names.
+    """
+
+    def __init__(self, nodes: Iterable[str]) -> None:
+        """Initialize the ring.
+
+        Args:
+            nodes: Names of every node, including this one.
+        """
+        points = sorted(
+            (_hash(f"{node}#{replica}"), node)
+            for node in set(nodes)
+            for replica in range(RING_REPLICAS)
+        )
+        self._hashes = [point for point, _ in points]
+        self._nodes = [node for _, node in points]
+
+    def owner(self, pixel_id: int | str) -> str:
+        """Return the node a die belongs to.
+
+        Args:
+            pixel_id: The die to look up.
+
+        Returns:
+            The name of the owning node.
+        """
+        index = bisect(self._hashes, _hash(str(pixel_id)))
+        return self._nodes[index % len(self._nodes)]
+
+
+class RelayPeer:
+    """Forwarding queue and statistics for one peer instance."""
+
+    def __init__(self, name: str, url: str) -> None:
+        """Initialize the peer.
+
+        Args:
+            name: Node name of the peer on the hash ring.
+            url: Full webhook URL of the peer.
+        """
+        self.name = name
+        self.url = url
+        self.queue: deque[dict[str, Any]] = deque(maxlen=RELAY_MAX_QUEUE)
+        self.flushing = False
+        self.flush_task: asyncio.Task[None] | None = None
+        self.backoff = 0.0
+        self.retry_unsub: CALLBACK_TYPE | None = None
+        self.forwarded = 0
+        self.rejected = 0
+        self.retried = 0
+        self.dropped = 0
+        self.latency: float | None = None
+
+    def stats(self) -> dict[str, Any]:
+        """Return forwarding statistics for diagnostics.
+
+        The peer's URL is left out, since its webhook ID lets anyone who
+        knows it post rolls.
+
+        Returns:
+            Queue depth, counters and the average latency in milliseconds.
+        """
+        return {
+            "queue_depth": len(self.queue),
+            "forwarded": self.forwarded,
+            "rejected": self.rejected,
+            "retried": self.retried,
+            "dropped": self.dropped,
+            "latency_ms": None if self.latency is None else self.latency * 1000,
+        }
+
+
+class RollRelay:
+    """Forward rolls of dice owned by other instances to those instances.
+
+    Rolls for each peer are queued and sent by a flush task that drains the
+    queue in batches of up to RELAY_MAX_BATCH rolls, encoded as MessagePack,
+    over Home Assistant's shared keep-alive client session. Rolls that
+    arrive while a request is in flight are sent together in the next one.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, node_id: str, peers: dict[str, str]
+    ) -> None:
+        """Initialize the relay.
+
+        Args:
+            hass: The Home Assistant instance.
+            node_id: Name of this node on the hash ring.
+            peers: Webhook URL of every other node, by node name.
+        """
+        self._hass = hass
+        self._session = async_get_clientsession(hass)
+        self.node_id = node_id
+        self.ring = HashRing([node_id, *peers])
+        self.peers = {name: RelayPeer(name, url) for name, url in peers.items()}
+
+    @callback
+    def route(self, records: list[RollRecord]) -> list[RollRecord]:
+        """Queue rolls owned by peers and return the ones owned by this node.
+
+        Args:
+            records: Validated rolls received by this node.
+
+        Returns:
+            The rolls this node should process itself.
+        """
+        owned: list[RollRecord] = []
+        for record in records:
+            owner = self.ring.owner(record.pixel_id)
+            if owner == self.node_id:
+                owned.append(record)
+                continue
+            peer = self.peers[owner]
+            if len(peer.queue) == peer.queue.maxlen:
+                peer.dropped += 1
+            peer.queue.append(record.as_payload())
+            self._async_schedule_flush(peer)
+        return owned
+
+    @callback
+    def _async_schedule_flush(self, peer: RelayPeer) -> None:
+        """Start draining a peer's queue unless it is already being drained."""
+        if peer.flushing or peer.retry_unsub is not None or not peer.queue:
+            return
+        peer.flushing = True
+        peer.flush_task = self._hass.async_create_task(
+            self._async_flush(peer), f"pixels_dice relay to {peer.name}"
+        )
+
+    async def _async_flush(self, peer: RelayPeer) -> None:
+        """Send a peer's queued rolls in batches until the queue is empty."""
+        try:
+            while peer.queue:
+                batch = [
+                    peer.queue.popleft()
+                    for _ in range(min(RELAY_MAX_BATCH, len(peer.queue)))
+                ]
+                try:
+                    sent = await self._async_send(peer, batch)
+                except asyncio.CancelledError:
+                    peer.dropped += len(batch)
+                    raise
+                if not sent:
+                    self._async_requeue(peer, batch)
+                    return
+        finally:
+            peer.flushing = False
+
+    async def _async_send(
+        self, peer: RelayPeer, batch: list[dict[str, Any]]
+    ) -> bool:
+        """Post a batch to a peer.
+
+        Returns:
+            False if the batch should be retried, True otherwise.
+        """
+        start = time.monotonic()
+        try:
+            response = await self._session.post(
+                peer.url,
+                data=msgpack.packb(batch),
+                headers={
+                    "Content-Type": "application/msgpack",
+                    RELAY_HEADER: self.node_id,
+                },
+                timeout=RELAY_TIMEOUT,
+            )
+            response.release()
+        except (ClientError, TimeoutError) as err:
+            _LOGGER.debug(
+                "Relaying %s rolls to %s failed: %s", len(batch), peer.name, err
+            )
+            return False
+
+        latency = time.monotonic() - start
+        if peer.latency is None:
+            peer.latency = latency
+        else:
+            peer.latency += LATENCY_SMOOTHING * (latency - peer.latency)
+
+        if response.status >= 500:
+            _LOGGER.debug(
+                "Peer %s answered relayed rolls with %s", peer.name, response.status
+            )
+            return False
+
+        peer.backoff = 0.0
+        if response.status >= 400:
+            # The peer rejected the rolls themselves; resending won't help
+            peer.rejected += len(batch)
+        else:
+            peer.forwarded += len(batch)
+        return True
+
+    @callback
+    def _async_requeue(self, peer: RelayPeer, batch: list[dict[str, Any]]) -> None:
+        """Put a failed batch back in front of the queue and retry later."""
+        peer.retried += len(batch)
+        # The batch holds the oldest rolls, so it is what gets trimmed if
+        # rolls queued while it was in flight leave no room for all of it;
+        # extendleft on a full deque would drop the newest rolls instead
+        overflow = max(len(peer.queue) + len(batch) - peer.queue.maxlen, 0)
+        peer.dropped += overflow
+        peer.queue.extendleft(reversed(batch[overflow:]))
+
+        peer.backoff = min(max(peer.backoff * 2, 1.0), RELAY_MAX_BACKOFF)
+
+        @callback
+        def _async_retry(now: Any) -> None:
+            peer.retry_unsub = None
+            self._async_schedule_flush(peer)
+
+        peer.retry_unsub = async_call_later(
+            self._hass, peer.backoff, HassJob(_async_retry, cancel_on_shutdown=True)
+        )
+
+    async def async_shutdown(self) -> None:
+        """Stop forwarding when the config entry is unloaded.
+
+        Pending retries and in-flight requests are cancelled. Rolls that can
+        no longer be sent, including every queued roll when the entry is
+        reloaded after an options change, are counted as dropped and logged.
+        """
+        for peer in self.peers.values():
+            dropped = peer.dropped
+            if peer.retry_unsub is not None:
+                peer.retry_unsub()
+                peer.retry_unsub = None
+            if peer.flush_task is not None and not peer.flush_task.done():
+                peer.flush_task.cancel()
+                with suppress(asyncio.CancelledError):
+                    await peer.flush_task
+            peer.flush_task = None
+            peer.dropped += len(peer.queue)
+            peer.queue.clear()
+            if peer.dropped > dropped:
+                _LOGGER.warning(
+                    "Discarded %s rolls not yet relayed to %s",
+                    peer.dropped - dropped,
+                    peer.name,
+                )
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """Return forwarding statistics of every peer.
+
+        Returns:
+            Statistics by peer name.
+        """
+        return {name: peer.stats() for name, peer in self.peers.items()}
@@ -1,6 +1,7 @@
 """Sensor platform for Pixels Dice integration."""
 from __future__ import annotations
 
+from datetime import timedelta
 import logging
 
 from homeassistant.config_entries import ConfigEntry
@@ -8,9 +9,14 @@ from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from .const import DOMAIN
+from .entity import PixelsDiceRelayLatencyEntity, PixelsDiceRelayQueueDepthEntity
+from .relay import RollRelay
 
 _LOGGER = logging.getLogger(__name__)
 
+# Relay peer sensors poll the relay's in-memory statistics
+SCAN_INTERVAL = timedelta(seconds=30)
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -30,5 +36,19 @@ async def async_setup_entry(
     hass.data[DOMAIN].setdefault(entry.entry_id, {})
     hass.data[DOMAIN][entry.entry_id]["add_entities"] = async_add_entities
 
+    relay: RollRelay | None = hass.data[DOMAIN][entry.entry_id].get("relay")
+    if relay is not None:
+        async_add_entities(
+            [
+                entity
+                for peer in relay.peers.values()
+                for entity in (
+                    PixelsDiceRelayQueueDepthEntity(peer),
+                    PixelsDiceRelayLatencyEntity(peer),
+                )
+            ],
+            update_before_add=True,
+        )
+
     _LOGGER.info("Sensor platform setup complete for entry %s", entry.entry_id)
     return True
@@ -0,0 +1,178 @@
+"""Services for the Pixels Dice integration."""
+from __future__ import annotations
+
+import logging
+
+import voluptuous as vol
+
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DOMAIN,
+    ATTR_EXPORT,
+    ATTR_LIMIT,
+    ATTR_NAME,
+    ATTR_PLAYERS,
+    EXPORT_NONE,
+    SERVICE_GET_BATTERY_FORECAST,
+    SERVICE_START_SESSION,
+    SERVICE_STOP_SESSION,
+)
+from .battery import BatteryForecasts
+from .session import EXPORT_FORMATS, RollSession, export_supported
+
+_LOGGER = logging.getLogger(__name__)
+
+START_SESSION_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_NAME): cv.string,
+        vol.Optional(ATTR_PLAYERS, default={}): {
+            cv.string: vol.All(cv.ensure_list, [vol.Coerce(int)])
+        },
+    }
+)
+
+STOP_SESSION_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_EXPORT, default=EXPORT_NONE): vol.In(
+            (EXPORT_NONE, *EXPORT_FORMATS)
+        ),
+    }
+)
+
+GET_BATTERY_FORECAST_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_LIMIT): vol.All(vol.Coerce(int), vol.Range(min=1)),
+    }
+)
+
+
+def _get_entry_data(hass: HomeAssistant) -> dict:
+    """Return the data of the Pixels Dice config entry.
+
+    Args:
+        hass: The Home Assistant instance.
+
+    Returns:
+        The config entry's data in ``hass.data``.
+
+    Raises:
+        ServiceValidationError: If the integration is not set up.
+    """
+    # We only support one instance, like the webhook
+    entries = hass.config_entries.async_entries(DOMAIN)
+    entry_data = None
+    if entries:
+        entry_data = hass.data.get(DOMAIN, {}).get(entries[0].entry_id)
+    if entry_data is None:
+        raise ServiceValidationError("Pixels Dice is not set up")
+    return entry_data
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the Pixels Dice services.
+
+    Args:
+        hass: The Home Assistant instance.
+    """
+
+    async def async_start_session(call: ServiceCall) -> None:
+        """Start recording rolls into a new game session."""
+        entry_data = _get_entry_data(hass)
+        if entry_data.get("session") is not None:
+            raise ServiceValidationError("A session is already running")
+
+        started = dt_util.utcnow()
+        name = call.data.get(ATTR_NAME)
+        if not name:
+            name = f"Session {dt_util.as_local(started):%Y-%m-%d %H:%M}"
+        entry_data["session"] = RollSession(name, started, call.data[ATTR_PLAYERS])
+        _LOGGER.info("Started dice session %s", name)
+
+    async def async_stop_session(call: ServiceCall) -> ServiceResponse:
+        """Stop the running session, summarize it and optionally export it."""
+        entry_data = _get_entry_data(hass)
+        session: RollSession | None = entry_data.get("session")
+        if session is None:
+            raise ServiceValidationError("No session is running")
+
+        # Refuse an export that can't work while the session is still intact
+        export_format = call.data[ATTR_EXPORT]
+        if export_format != EXPORT_NONE and not await hass.async_add_executor_job(
+            export_supported, export_format
+        ):
+            raise ServiceValidationError("Parquet export requires the pyarrow package")
+
+        # Detach the session first so no roll is recorded into it while the
+        # executor reads its buffers
+        entry_data["session"] = None
+        session.stopped = dt_util.utcnow()
+        _LOGGER.info(
+            "Stopped dice session %s with %s rolls", session.name, len(session)
+        )
+
+        summary = await hass.async_add_executor_job(session.summarize)
+
+        if export_format != EXPORT_NONE:
+            path = hass.config.path(
+                DOMAIN, f"session_{session.started:%Y%m%d_%H%M%S}.{export_format}"
+            )
+            try:
+                await hass.async_add_executor_job(session.export, path, export_format)
+            except OSError as err:
+                # The session is already stopped; still return its summary
+                _LOGGER.error("Could not export session %s: %s", session.name, err)
+                summary["export_error"] = str(err)
+            else:
+                summary["export_path"] = path
+
+        return summary
+
+    async def async_get_battery_forecast(call: ServiceCall) -> ServiceResponse:
+        """Return dice ranked by when their battery is expected to run out."""
+        entry_data = _get_entry_data(hass)
+        battery: BatteryForecasts = entry_data["battery"]
+        forecast_entities = entry_data.get("forecast_entities", {})
+
+        dice = []
+        for pixel_id, depleted_at in battery.ranking.ranked(call.data.get(ATTR_LIMIT)):
+            entity = forecast_entities.get(pixel_id)
+            dice.append(
+                {
+                    "pixel_id": pixel_id,
+                    "entity_id": entity.entity_id if entity else None,
+                    "empty_at": dt_util.utc_from_timestamp(depleted_at).isoformat(),
+                }
+            )
+        return {"dice": dice}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_START_SESSION,
+        async_start_session,
+        schema=START_SESSION_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_STOP_SESSION,
+        async_stop_session,
+        schema=STOP_SESSION_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_BATTERY_FORECAST,
+        async_get_battery_forecast,
+        schema=GET_BATTERY_FORECAST_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
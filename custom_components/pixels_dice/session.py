@@ -0,0 +1,324 @@
+"""Game-session recording for Pixels Dice."""
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterator
+import csv
+from datetime import UTC, datetime
+from importlib.util import find_spec
+import os
+from typing import Any
+
+import numpy as np
+
+from .die_types import DIE_TYPES
+from .payload import RollRecord
+
+EXPORT_FORMAT_CSV = "csv"
+EXPORT_FORMAT_PARQUET = "parquet"
+EXPORT_FORMATS = (EXPORT_FORMAT_CSV, EXPORT_FORMAT_PARQUET)
+
+# Rows written per chunk when exporting, so an export never holds more than
+# one chunk of formatted rows in memory
+EXPORT_CHUNK_SIZE = 10_000
+
+EXPORT_COLUMNS = (
+    "timestamp",
+    "pixel_id",
+    "pixel_name",
+    "player",
+    "die_type",
+    "face_value",
+)
+
+
+def _crit_face(die_type: str) -> float:
+    """Return the face value that counts as a crit, or 0 if there is none.
+
+    Args:
+        die_type: Die type string such as "d20".
+
+    Returns:
+        The die type's crit face, 0 for die types without one.
+    """
+    spec = DIE_TYPES.get(die_type)
+    if spec is None or spec.crit_face is None:
+        return 0.0
+    return float(spec.crit_face)
+
+
+def export_supported(export_format: str) -> bool:
+    """Return whether the packages needed for an export format are installed.
+
+    This may touch the filesystem and must run in an executor.
+
+    Args:
+        export_format: One of EXPORT_FORMATS.
+
+    Returns:
+        False if Parquet is requested and pyarrow is not installed.
+    """
+    return export_format != EXPORT_FORMAT_PARQUET or find_spec("pyarrow") is not None
+
+
+def _ratios(
+    numerators: np.ndarray, denominators: np.ndarray
+) -> list[float | None]:
+    """Divide element-wise, returning None wherever the denominator is zero."""
+    return [
+        float(numerator / denominator) if denominator else None
+        for numerator, denominator in zip(numerators, denominators)
+    ]
+
+
+class RollSession:
+    """Rolls recorded while a game session is open.
+
+    Rolls are appended to parallel typed arrays rather than a list of dicts,
+    which keeps a session of hundreds of thousands of rolls compact and lets
+    the summary be computed with numpy over zero-copy views of the arrays.
+    A session must not be recorded into once it is being summarized or
+    exported from an executor thread.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        started: datetime,
+        players: dict[str, list[int]] | None = None,
+    ) -> None:
+        """Initialize an empty session.
+
+        Args:
+            name: Display name of the session.
+            started: When the session was started.
+            players: Optional mapping of player name to the pixel IDs of
+                their dice. Dice without a player are reported under their
+                own name.
+        """
+        self.name = name
+        self.started = started
+        self.stopped: datetime | None = None
+        self._player_by_pixel_id = {
+            pixel_id: player
+            for player, pixel_ids in (players or {}).items()
+            for pixel_id in pixel_ids
+        }
+        self._timestamps = array("d")
+        self._pixel_ids = array("q")
+        self._face_values = array("d")
+        self._die_types = array("H")
+        self._die_type_names: list[str] = []
+        self._die_type_index: dict[str, int] = {}
+        self._pixel_names: dict[int, str] = {}
+        self._last_die_types: dict[int, str] = {}
+
+    def __len__(self) -> int:
+        """Return the number of recorded rolls."""
+        return len(self._pixel_ids)
+
+    def record(self, record: RollRecord, timestamp: float) -> None:
+        """Append a roll to the session.
+
+        Args:
+            record: The validated roll.
+            timestamp: POSIX timestamp of the roll.
+        """
+        die_type_index = self._die_type_index.get(record.die_type)
+        if die_type_index is None:
+            die_type_index = len(self._die_type_names)
+            self._die_type_index[record.die_type] = die_type_index
+            self._die_type_names.append(record.die_type)
+
+        self._timestamps.append(timestamp)
+        self._pixel_ids.append(record.pixel_id)
+        self._face_values.append(record.face_value)
+        self._die_types.append(die_type_index)
+        self._pixel_names[record.pixel_id] = record.pixel_name
+        self._last_die_types[record.pixel_id] = record.die_type
+
+    def player(self, pixel_id: int) -> str:
+        """Return the player a die belongs to.
+
+        Args:
+            pixel_id: The die to look up.
+
+        Returns:
+            The assigned player, or the die's name if it has none.
+        """
+        player = self._player_by_pixel_id.get(pixel_id)
+        if player is None:
+            player = self._pixel_names.get(pixel_id, str(pixel_id))
+        return player
+
+    def summarize(self) -> dict[str, Any]:
+        """Compute roll counts, means and crit rates per die and per player.
+
+        Crit rates only count rolls of die types that have a crit face and
+        are None for dice without any such roll.
+
+        Returns:
+            A JSON-serializable summary of the session.
+        """
+        pixel_ids = np.frombuffer(self._pixel_ids, dtype=np.int64)
+        faces = np.frombuffer(self._face_values, dtype=np.float64)
+        die_types = np.frombuffer(self._die_types, dtype=np.uint16)
+
+        crit_faces = np.array(
+            [_crit_face(name) for name in self._die_type_names], dtype=np.float64
+        )[die_types]
+        has_crit = crit_faces > 0
+        is_crit = has_crit & (faces == crit_faces)
+
+        dice, die_index, die_rolls = np.unique(
+            pixel_ids, return_inverse=True, return_counts=True
+        )
+        num_dice = len(dice)
+        die_sums = np.bincount(die_index, faces, num_dice)
+        die_crits = np.bincount(die_index, is_crit, num_dice)
+        die_critable = np.bincount(die_index, has_crit, num_dice)
+
+        # Players are aggregated from the per-die totals
+        die_players = [self.player(int(pixel_id)) for pixel_id in dice]
+        players, player_index = np.unique(
+            np.array(die_players, dtype=object), return_inverse=True
+        )
+        num_players = len(players)
+        player_rolls = np.bincount(player_index, die_rolls, num_players)
+        player_sums = np.bincount(player_index, die_sums, num_players)
+        player_crits = np.bincount(player_index, die_crits, num_players)
+        player_critable = np.bincount(player_index, die_critable, num_players)
+
+        return {
+            "name": self.name,
+            "started": self.started.isoformat(),
+            "stopped": self.stopped.isoformat() if self.stopped else None,
+            "rolls": len(self),
+            "dice": [
+                {
+                    "pixel_id": int(pixel_id),
+                    "pixel_name": self._pixel_names[int(pixel_id)],
+                    "player": player,
+                    "die_type": self._last_die_types[int(pixel_id)],
+                    "rolls": int(rolls),
+                    "mean": mean,
+                    "crit_rate": crit_rate,
+                }
+                for pixel_id, player, rolls, mean, crit_rate in zip(
+                    dice,
+                    die_players,
+                    die_rolls,
+                    _ratios(die_sums, die_rolls),
+                    _ratios(die_crits, die_critable),
+                )
+            ],
+            "players": [
+                {
+                    "player": str(player),
+                    "rolls": int(rolls),
+                    "mean": mean,
+                    "crit_rate": crit_rate,
+                }
+                for player, rolls, mean, crit_rate in zip(
+                    players,
+                    player_rolls,
+                    _ratios(player_sums, player_rolls),
+                    _ratios(player_crits, player_critable),
+                )
+            ],
+        }
+
+    def _iter_chunks(
+        self, chunk_size: int
+    ) -> Iterator[tuple[array, array, array, array]]:
+        """Yield the session columns in slices of at most chunk_size rows."""
+        for start in range(0, len(self), chunk_size):
+            end = start + chunk_size
+            yield (
+                self._timestamps[start:end],
+                self._pixel_ids[start:end],
+                self._face_values[start:end],
+                self._die_types[start:end],
+            )
+
+    def export(
+        self, path: str, export_format: str, chunk_size: int = EXPORT_CHUNK_SIZE
+    ) -> None:
+        """Write every roll to a file, one chunk at a time.
+
+        This does blocking I/O and must run in an executor.
+
+        Args:
+            path: Destination file; missing directories are created.
+            export_format: One of EXPORT_FORMATS.
+            chunk_size: Number of rows formatted and written at a time.
+
+        Raises:
+            ImportError: If Parquet is requested and pyarrow is not installed.
+        """
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if export_format == EXPORT_FORMAT_PARQUET:
+            self._export_parquet(path, chunk_size)
+        else:
+            self._export_csv(path, chunk_size)
+
+    def _export_csv(self, path: str, chunk_size: int) -> None:
+        """Write the session as CSV."""
+        names = self._die_type_names
+        with open(path, "w", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            writer.writerow(EXPORT_COLUMNS)
+            for timestamps, pixel_ids, faces, die_types in self._iter_chunks(
+                chunk_size
+            ):
+                writer.writerows(
+                    (
+                        datetime.fromtimestamp(timestamp, UTC).isoformat(),
+                        pixel_id,
+                        self._pixel_names[pixel_id],
+                        self.player(pixel_id),
+                        names[die_type],
+                        face,
+                    )
+                    for timestamp, pixel_id, face, die_type in zip(
+                        timestamps, pixel_ids, faces, die_types
+                    )
+                )
+
+    def _export_parquet(self, path: str, chunk_size: int) -> None:
+        """Write the session as Parquet, one record batch per chunk."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = pa.schema(
+            [
+                ("timestamp", pa.timestamp("us", tz="UTC")),
+                ("pixel_id", pa.int64()),
+                ("pixel_name", pa.string()),
+                ("player", pa.string()),
+                ("die_type", pa.dictionary(pa.uint16(), pa.string())),
+                ("face_value", pa.float64()),
+            ]
+        )
+        die_type_names = pa.array(self._die_type_names, pa.string())
+        with pq.ParquetWriter(path, schema) as writer:
+            for timestamps, pixel_ids, faces, die_types in self._iter_chunks(
+                chunk_size
+            ):
+                micros = np.frombuffer(timestamps, dtype=np.float64) * 1_000_000
+                writer.write_batch(
+                    pa.record_batch(
+                        [
+                            pa.array(micros.astype(np.int64), schema.field(0).type),
+                            pa.array(np.frombuffer(pixel_ids, dtype=np.int64)),
+                            pa.array([self._pixel_names[p] for p in pixel_ids]),
+                            pa.array([self.player(p) for p in pixel_ids]),
+                            pa.DictionaryArray.from_arrays(
+                                pa.array(np.frombuffer(die_types, dtype=np.uint16)),
+                                die_type_names,
+                            ),
+                            pa.array(np.frombuffer(faces, dtype=np.float64)),
+                        ],
+                        schema=schema,
+                    )
+                )
@@ -1,19 +1,42 @@
 """Webhook support for Pixels Dice integration."""
 from __future__ import annotations
 
+from collections import Counter, defaultdict
 import json
 import logging
 
 from aiohttp import web
+from homeassistant.components.sensor import SensorEntity
 from homeassistant.components.webhook import (
     async_register as async_register_webhook,
     async_unregister as async_unregister_webhook,
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.const import Platform
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers import entity_registry as er
+from homeassistant.util import dt as dt_util
 
-from .const import DOMAIN, CONF_WEBHOOK_ID, DEFAULT_WEBHOOK_ID
-from .entity import PixelsDiceEntity
+from .battery import BatteryForecasts
+from .const import (
+    DOMAIN,
+    CONF_WEBHOOK_ID,
+    DEFAULT_WEBHOOK_ID,
+    EVENT_PATTERN,
+    RELAY_HEADER,
+)
+from .die_types import ROLL_FACE_OUT_OF_RANGE, check_roll
+from .entity import PixelsDiceBatteryForecastEntity, PixelsDiceEntity
+from .eviction import DormantDiceTracker
+from .patterns import PatternEngine
+from .payload import (
+    COMPACT_CONTENT_TYPES,
+    PayloadError,
+    RollRecord,
+    decode_body,
+    parse_rolls,
+)
+from .relay import RollRelay
+from .session import RollSession
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -32,40 +55,17 @@ async def async_handle_webhook(
         An HTTP response indicating success or failure.
     """
     try:
-        data = await request.json()
+        if request.content_type in COMPACT_CONTENT_TYPES:
+            data = decode_body(request.content_type, await request.read())
+        else:
+            data = await request.json()
+        records = parse_rolls(data)
     except json.JSONDecodeError:
         _LOGGER.warning("Received webhook with invalid JSON")
         return web.Response(text="Invalid JSON", status=400)
-
-    # Validate required fields
-    if "pixelId" not in data:
-        _LOGGER.warning("Received webhook missing pixelId")
-        return web.Response(text="Missing pixelId", status=400)
-
-    pixel_id = data.get("pixelId")
-    pixel_name = data.get("pixelName", "Unknown Dice")
-    face_value = data.get("faceValue")
-    led_count = data.get("ledCount")
-    die_type = data.get("dieType", "d20")
-    colorway = data.get("colorway", "default")
-    battery_level = data.get("batteryLevel", 0.0)
-
-    if face_value is None or led_count is None:
-        _LOGGER.warning("Received webhook missing critical data (faceValue or ledCount)")
-        return web.Response(text="Missing critical data", status=400)
-
-    # Validate numeric types
-    if not isinstance(face_value, (int, float)):
-        _LOGGER.warning("faceValue must be numeric, got %s", type(face_value).__name__)
-        return web.Response(text="faceValue must be numeric", status=400)
-    if not isinstance(led_count, (int, float)):
-        _LOGGER.warning("ledCount must be numeric, got %s", type(led_count).__name__)
-        return web.Response(text="ledCount must be numeric", status=400)
-    if not isinstance(battery_level, (int, float)):
-        _LOGGER.warning(
-            "batteryLevel must be numeric, got %s", type(battery_level).__name__
-        )
-        return web.Response(text="batteryLevel must be numeric", status=400)
+    except PayloadError as err:
+        _LOGGER.warning("Rejected webhook payload: %s", err)
+        return web.Response(text=str(err), status=err.status)
 
     # Get the first config entry (we only support one instance)
     entries = hass.config_entries.async_entries(DOMAIN)
@@ -74,7 +74,6 @@ async def async_handle_webhook(
         return web.Response(text="Integration not configured", status=500)
 
     entry = entries[0]
-    entity_id_prefix = f"{DOMAIN}_{pixel_id}"
 
     # Guard access to hass.data
     entry_data = hass.data.get(DOMAIN, {}).get(entry.entry_id)
@@ -82,45 +81,176 @@ async def async_handle_webhook(
         _LOGGER.error("Integration data not initialized for entry %s", entry.entry_id)
         return web.Response(text="Internal error", status=500)
 
-    # Check if entity already exists
-    registry = er.async_get(hass)
-    entity_entries = er.async_entries_for_config_entry(registry, entry.entry_id)
+    # Rolls of dice owned by another instance are forwarded to it; rolls that
+    # were already relayed are always processed here, even if the peers
+    # disagree about the ring, so a roll is never forwarded twice
+    relay: RollRelay | None = entry_data.get("relay")
+    if relay is not None and RELAY_HEADER not in request.headers:
+        records = relay.route(records)
+        if not records:
+            return web.Response(text="Forwarded", status=200)
+
+    # Impossible rolls are dropped and rolls with an unexpected LED count are
+    # only flagged; both are counted per die for diagnostics
+    roll_issues: defaultdict[int, Counter[str]] = entry_data.setdefault(
+        "roll_issues", defaultdict(Counter)
+    )
+    tracker: DormantDiceTracker | None = entry_data.get("tracker")
+    accepted = 0
+    for record in records:
+        issue = check_roll(record.die_type, record.face_value, record.led_count)
+        if issue is not None:
+            roll_issues[record.pixel_id][issue] += 1
+            if issue == ROLL_FACE_OUT_OF_RANGE:
+                # Dice sending only impossible rolls still hold counts, so
+                # they are tracked and evicted like any other die
+                if tracker is not None:
+                    async_evict_dice(hass, entry_data, tracker.touch(record.pixel_id))
+                continue
+        if not _async_apply_roll(hass, entry_data, record):
+            return web.Response(text="Internal error", status=500)
+        accepted += 1
+
+    if not accepted:
+        return web.Response(text="faceValue out of range for dieType", status=400)
 
+    return web.Response(text="Success", status=200)
+
+
+@callback
+def _async_apply_roll(
+    hass: HomeAssistant, entry_data: dict, record: RollRecord
+) -> bool:
+    """Create or update the entity of the die that rolled.
+
+    Args:
+        hass: The Home Assistant instance.
+        entry_data: The config entry's data in ``hass.data``.
+        record: The validated roll.
+
+    Returns:
+        False if the entity could not be added, True otherwise.
+    """
+    pixel_id = record.pixel_id
+    entity_id_prefix = f"{DOMAIN}_{pixel_id}"
+    now = dt_util.utcnow().timestamp()
+
+    battery: BatteryForecasts | None = entry_data.get("battery")
+    depleted_at = None
+    if battery is not None:
+        depleted_at = battery.update(pixel_id, now, record.battery_level)
+
+    # Check if entity already exists. Dice evicted from memory keep their
+    # registry entry, so a missing live entity is simply rehydrated below.
+    registry = er.async_get(hass)
+    entities = entry_data.setdefault("entities", {})
+    forecast_entities = entry_data.setdefault("forecast_entities", {})
     existing_entity = None
-    for entity_entry in entity_entries:
-        if entity_entry.unique_id == entity_id_prefix:
-            entities = entry_data.get("entities", {})
-            existing_entity = entities.get(pixel_id)
-            break
+    if registry.async_get_entity_id(Platform.SENSOR, DOMAIN, entity_id_prefix):
+        existing_entity = entities.get(pixel_id)
+    new_entities: list[SensorEntity] = []
 
     if existing_entity:
         # Update existing entity
-        _LOGGER.debug("Updating existing dice %s with roll value %s", pixel_id, face_value)
-        existing_entity.update_state(face_value, die_type, colorway, battery_level)
+        _LOGGER.debug(
+            "Updating existing dice %s with roll value %s", pixel_id, record.face_value
+        )
+        existing_entity.update_state(
+            record.face_value, record.die_type, record.colorway, record.battery_level
+        )
     else:
         # Create new entity
         _LOGGER.info("Creating new dice entity for pixel_id %s", pixel_id)
-        new_entity = PixelsDiceEntity(
-            pixel_id,
-            pixel_name,
-            led_count,
-            die_type,
-            colorway,
-            battery_level,
-            initial_value=face_value,
+        new_entities.append(
+            PixelsDiceEntity(
+                pixel_id,
+                record.pixel_name,
+                record.led_count,
+                record.die_type,
+                record.colorway,
+                record.battery_level,
+                initial_value=record.face_value,
+            )
         )
 
-        entry_data.setdefault("entities", {})[pixel_id] = new_entity
+    forecast_entity = forecast_entities.get(pixel_id)
+    if forecast_entity:
+        forecast_entity.update_forecast(depleted_at)
+    else:
+        new_entities.append(PixelsDiceBatteryForecastEntity(pixel_id, depleted_at))
 
-        # Add entity using the callback stored during setup
+    if new_entities:
+        # Add entities using the callback stored during setup
         add_entities = entry_data.get("add_entities")
-        if add_entities:
-            add_entities([new_entity])
-        else:
+        if not add_entities:
             _LOGGER.error("add_entities callback not found")
-            return web.Response(text="Internal error", status=500)
+            return False
+        for new_entity in new_entities:
+            if isinstance(new_entity, PixelsDiceBatteryForecastEntity):
+                forecast_entities[pixel_id] = new_entity
+            else:
+                entities[pixel_id] = new_entity
+        add_entities(new_entities)
 
-    return web.Response(text="Success", status=200)
+    session: RollSession | None = entry_data.get("session")
+    if session is not None:
+        session.record(record, now)
+
+    patterns: PatternEngine | None = entry_data.get("patterns")
+    if patterns:
+        for rule in patterns.advance(pixel_id, record.die_type, record.face_value):
+            hass.bus.async_fire(
+                EVENT_PATTERN,
+                {
+                    "pattern": rule.name,
+                    "pixel_id": pixel_id,
+                    "pixel_name": record.pixel_name,
+                    "die_type": record.die_type,
+                    "face_value": record.face_value,
+                },
+            )
+
+    tracker: DormantDiceTracker | None = entry_data.get("tracker")
+    if tracker is not None:
+        async_evict_dice(hass, entry_data, tracker.touch(pixel_id))
+
+    return True
+
+
+@callback
+def async_evict_dice(
+    hass: HomeAssistant, entry_data: dict, pixel_ids: list[int]
+) -> None:
+    """Suspend dice from memory while keeping their registry entries.
+
+    The die's entities are removed from their platform, which marks their
+    states as unavailable, and are recreated from the registry on the die's
+    next roll. Its pattern, battery forecast and roll issue state is dropped.
+
+    Args:
+        hass: The Home Assistant instance.
+        entry_data: The config entry's data in ``hass.data``.
+        pixel_ids: The dice to evict.
+    """
+    entities = entry_data.get("entities", {})
+    forecast_entities = entry_data.get("forecast_entities", {})
+    patterns: PatternEngine | None = entry_data.get("patterns")
+    battery: BatteryForecasts | None = entry_data.get("battery")
+    roll_issues = entry_data.get("roll_issues", {})
+    for pixel_id in pixel_ids:
+        roll_issues.pop(pixel_id, None)
+        if patterns is not None:
+            patterns.forget(pixel_id)
+        if battery is not None:
+            battery.forget(pixel_id)
+        for entity in (
+            entities.pop(pixel_id, None),
+            forecast_entities.pop(pixel_id, None),
+        ):
+            if entity is None:
+                continue
+            _LOGGER.debug("Evicting %s from memory", entity.unique_id)
+            hass.async_create_task(entity.async_remove())
 
 
 async def async_setup_webhook(hass: HomeAssistant, entry_id: str, webhook_id: str) -> None:
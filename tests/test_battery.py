@@ -0,0 +1,117 @@
+"""Tests for the Pixels Dice battery forecasting."""
+import random
+
+import pytest
+
+from custom_components.pixels_dice.battery import (
+    FORECAST_SAMPLE_INTERVAL,
+    FORECAST_WINDOW,
+    BatteryForecaster,
+    BatteryForecasts,
+    BatteryRanking,
+)
+
+HOUR = 3600.0
+
+
+def test_forecast_linear_drain() -> None:
+    """Test that a steady drain of 1% per hour empties 50 hours after 50%."""
+    forecaster = BatteryForecaster()
+    for hour in range(51):
+        forecaster.add(1_700_000_000.0 + hour * HOUR, 1.0 - hour * 0.01)
+
+    assert forecaster.depleted_at() == pytest.approx(1_700_000_000.0 + 100 * HOUR)
+
+
+def test_forecast_needs_draining_trend() -> None:
+    """Test that too few samples or a flat level give no forecast."""
+    forecaster = BatteryForecaster()
+    assert forecaster.depleted_at() is None
+
+    for hour in range(3):
+        forecaster.add(hour * HOUR, 0.9 - hour * 0.01)
+    assert forecaster.depleted_at() is None
+
+    flat = BatteryForecaster()
+    for hour in range(10):
+        flat.add(hour * HOUR, 0.5)
+    assert flat.depleted_at() is None
+
+
+def test_forecast_window_is_bounded() -> None:
+    """Test that only the most recent samples drive the forecast."""
+    forecaster = BatteryForecaster()
+    # A slow drain followed by a fast one: the window only sees the latter
+    for hour in range(FORECAST_WINDOW):
+        forecaster.add(hour * HOUR, 1.0 - hour * 0.001)
+    start = FORECAST_WINDOW * HOUR
+    level = 1.0 - FORECAST_WINDOW * 0.001
+    for hour in range(FORECAST_WINDOW):
+        forecaster.add(start + hour * HOUR, level - hour * 0.01)
+
+    last_level = level - (FORECAST_WINDOW - 1) * 0.01
+    expected = start + (FORECAST_WINDOW - 1) * HOUR + last_level / 0.01 * HOUR
+    assert forecaster.depleted_at() == pytest.approx(expected)
+
+
+def test_forecast_resets_after_charging() -> None:
+    """Test that a jump in battery level discards the pre-charge samples."""
+    forecaster = BatteryForecaster()
+    for hour in range(10):
+        forecaster.add(hour * HOUR, 0.5 - hour * 0.04)
+    assert forecaster.depleted_at() is not None
+
+    forecaster.add(10 * HOUR, 1.0)
+    assert forecaster.depleted_at() is None
+
+    for hour in range(11, 14):
+        forecaster.add(hour * HOUR, 1.0 - (hour - 10) * 0.01)
+    assert forecaster.depleted_at() == pytest.approx(110 * HOUR)
+
+
+def test_forecast_spans_bursts_of_rolls() -> None:
+    """Test that rolls in quick succession don't crowd out the drain history."""
+    forecaster = BatteryForecaster()
+    # Five hours of play at 1% per hour, rolling every ten seconds, with the
+    # level reported in whole percent
+    for second in range(0, 5 * 3600, 10):
+        level = round(0.9 - second / HOUR * 0.01, 2)
+        forecaster.add(second, level)
+
+    assert len(forecaster._samples) == 5 * 3600 / FORECAST_SAMPLE_INTERVAL
+    depleted_at = forecaster.depleted_at()
+    assert depleted_at is not None
+    # 90% at one percent per hour, within the error of the quantized levels
+    assert depleted_at == pytest.approx(90 * HOUR, rel=0.1)
+
+
+def test_ranking_stays_sorted() -> None:
+    """Test that the maintained ranking matches a full sort."""
+    ranking = BatteryRanking()
+    expected: dict[int, float] = {}
+    rng = random.Random(0)
+    for _ in range(5000):
+        pixel_id = rng.randrange(1000)
+        depleted_at = rng.choice([None, rng.random() * 1e6])
+        ranking.update(pixel_id, depleted_at)
+        if depleted_at is None:
+            expected.pop(pixel_id, None)
+        else:
+            expected[pixel_id] = depleted_at
+
+    assert len(ranking) == len(expected)
+    assert ranking.ranked() == sorted(expected.items(), key=lambda item: item[1])
+    assert ranking.ranked(3) == ranking.ranked()[:3]
+
+
+def test_forecasts_ignore_missing_levels_and_forget() -> None:
+    """Test that zero levels are skipped and forgotten dice leave the ranking."""
+    forecasts = BatteryForecasts()
+    for hour in range(5):
+        forecasts.update(1, hour * HOUR, 0.0)
+        forecasts.update(2, hour * HOUR, 0.8 - hour * 0.1)
+
+    assert [pixel_id for pixel_id, _ in forecasts.ranking.ranked()] == [2]
+
+    forecasts.forget(2)
+    assert forecasts.ranking.ranked() == []
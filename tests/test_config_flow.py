@@ -1,9 +1,22 @@
 """Tests for the Pixels Dice config flow."""
+import pytest
+
 from homeassistant import config_entries
 from homeassistant.core import HomeAssistant
 from homeassistant.data_entry_flow import FlowResultType
 
-from custom_components.pixels_dice.const import DOMAIN, CONF_WEBHOOK_ID, DEFAULT_WEBHOOK_ID
+from custom_components.pixels_dice.const import (
+    DOMAIN,
+    CONF_DORMANT_AFTER_HOURS,
+    CONF_MAX_LIVE_DICE,
+    CONF_PATTERNS,
+    CONF_RELAY_NODE_ID,
+    CONF_RELAY_PEERS,
+    CONF_WEBHOOK_ID,
+    DEFAULT_WEBHOOK_ID,
+)
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
 
 
 async def test_user_flow_shows_form(hass: HomeAssistant) -> None:
@@ -98,3 +111,78 @@ async def test_user_flow_aborts_if_already_configured(hass: HomeAssistant) -> No
     )
     assert result["type"] is FlowResultType.ABORT
     assert result["reason"] == "already_configured"
+
+
+async def test_options_flow_updates_eviction_limits(hass: HomeAssistant) -> None:
+    """Test that the options flow stores the dormant dice limits."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_WEBHOOK_ID: DEFAULT_WEBHOOK_ID},
+    )
+    entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    assert result["type"] is FlowResultType.FORM
+    assert result["step_id"] == "init"
+
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"],
+        user_input={CONF_MAX_LIVE_DICE: 200, CONF_DORMANT_AFTER_HOURS: 24},
+    )
+    await hass.async_block_till_done()
+
+    assert result["type"] is FlowResultType.CREATE_ENTRY
+    assert entry.options[CONF_MAX_LIVE_DICE] == 200
+    assert entry.options[CONF_DORMANT_AFTER_HOURS] == 24
+
+
+async def test_options_flow_rejects_invalid_patterns(hass: HomeAssistant) -> None:
+    """Test that invalid roll patterns are reported on the form."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_WEBHOOK_ID: DEFAULT_WEBHOOK_ID},
+    )
+    entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"],
+        user_input={CONF_PATTERNS: [{"name": "nat20", "type": "streak", "length": 3}]},
+    )
+
+    assert result["type"] is FlowResultType.FORM
+    assert result["errors"] == {CONF_PATTERNS: "invalid_patterns"}
+
+
+@pytest.mark.parametrize(
+    ("node_id", "peers"),
+    [
+        ("", {"table2": "http://table2.local:8123/api/webhook/pixels_dice"}),
+        ("table1", {"table1": "http://table1.local:8123/api/webhook/pixels_dice"}),
+        ("table1", {"table2": "not a url"}),
+    ],
+)
+async def test_options_flow_rejects_invalid_relay(
+    hass: HomeAssistant, node_id: str, peers: dict[str, str]
+) -> None:
+    """Test that unusable relay settings are reported on the form."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_WEBHOOK_ID: DEFAULT_WEBHOOK_ID},
+    )
+    entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"],
+        user_input={CONF_RELAY_NODE_ID: node_id, CONF_RELAY_PEERS: peers},
+    )
+
+    assert result["type"] is FlowResultType.FORM
+    assert result["errors"] == {CONF_RELAY_PEERS: "invalid_relay"}
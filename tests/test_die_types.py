@@ -0,0 +1,51 @@
+"""Tests for the Pixels Dice die type tables."""
+import pytest
+
+from custom_components.pixels_dice.die_types import (
+    DIE_TYPES,
+    ROLL_FACE_OUT_OF_RANGE,
+    ROLL_LED_COUNT_MISMATCH,
+    check_roll,
+    infer_die_type,
+)
+
+
+@pytest.mark.parametrize(
+    ("die_type", "face_value", "led_count", "issue"),
+    [
+        ("d6", 6, 6, None),
+        ("d6", 37, 6, ROLL_FACE_OUT_OF_RANGE),
+        ("d6", 0, 6, ROLL_FACE_OUT_OF_RANGE),
+        ("d6", 3, 20, ROLL_LED_COUNT_MISMATCH),
+        ("d6pipped", 6, 21, None),
+        ("d6fudge", -1, 6, None),
+        ("d6fudge", 2, 6, ROLL_FACE_OUT_OF_RANGE),
+        ("d10", 0, 10, None),
+        ("d10", 10, 10, None),
+        ("d00", 90, 10, None),
+        ("d00", 100, 10, None),
+        ("d00", 45, 10, ROLL_FACE_OUT_OF_RANGE),
+        ("d100", 45, 10, None),
+        ("d100", 100, 10, None),
+        ("d100", 101, 10, ROLL_FACE_OUT_OF_RANGE),
+        ("d100", 45.5, 10, ROLL_FACE_OUT_OF_RANGE),
+        ("d20", 20.0, 20, None),
+        ("d20", 20.5, 20, ROLL_FACE_OUT_OF_RANGE),
+        ("d1000", 999, 1, None),
+    ],
+)
+def test_check_roll(
+    die_type: str, face_value: float, led_count: int, issue: str | None
+) -> None:
+    """Test rolls against the die type tables."""
+    assert check_roll(die_type, face_value, led_count) == issue
+
+
+def test_infer_die_type_round_trips_unambiguous_led_counts() -> None:
+    """Test that every LED count infers the first die type that has it."""
+    assert infer_die_type(6) == "d6"
+    assert infer_die_type(10) == "d10"
+    assert infer_die_type(21) == "d6pipped"
+    assert infer_die_type(99) == "d20"
+    for spec in DIE_TYPES.values():
+        assert DIE_TYPES[infer_die_type(spec.led_count)].led_count == spec.led_count
@@ -0,0 +1,53 @@
+"""Tests for the Pixels Dice dormant dice tracker."""
+from custom_components.pixels_dice.eviction import DormantDiceTracker
+
+
+def test_tracker_evicts_least_recently_seen_beyond_limit() -> None:
+    """Test that the LRU limit evicts the least recently rolled dice."""
+    tracker = DormantDiceTracker(max_live=2, dormant_after=0)
+
+    assert tracker.touch(1, now=0.0) == []
+    assert tracker.touch(2, now=1.0) == []
+    # Rolling die 1 again makes die 2 the least recently seen
+    assert tracker.touch(1, now=2.0) == []
+    assert tracker.touch(3, now=3.0) == [2]
+
+    assert len(tracker) == 2
+    assert 1 in tracker
+    assert 2 not in tracker
+
+
+def test_tracker_evicts_dormant_dice() -> None:
+    """Test that dice unseen for longer than the dormancy age are evicted."""
+    tracker = DormantDiceTracker(max_live=0, dormant_after=10.0)
+
+    tracker.touch(1, now=0.0)
+    tracker.touch(2, now=5.0)
+
+    assert tracker.expired(now=9.0) == []
+    assert tracker.expired(now=12.0) == [1]
+    assert tracker.touch(3, now=20.0) == [2]
+    assert len(tracker) == 1
+
+
+def test_tracker_limits_disabled() -> None:
+    """Test that zero limits never evict anything."""
+    tracker = DormantDiceTracker(max_live=0, dormant_after=0)
+
+    for pixel_id in range(1000):
+        assert tracker.touch(pixel_id, now=float(pixel_id)) == []
+
+    assert tracker.expired(now=1e9) == []
+    assert len(tracker) == 1000
+
+
+def test_tracker_discard() -> None:
+    """Test that discarded dice are no longer tracked."""
+    tracker = DormantDiceTracker(max_live=1, dormant_after=0)
+
+    tracker.touch(1, now=0.0)
+    tracker.discard(1)
+    tracker.discard(1)
+
+    assert tracker.touch(2, now=1.0) == []
+    assert 1 not in tracker
@@ -0,0 +1,98 @@
+"""Tests for the Pixels Dice roll-pattern engine."""
+import pytest
+import voluptuous as vol
+
+from custom_components.pixels_dice.patterns import compile_patterns
+
+
+def _matches(engine, rolls, pixel_id: int = 1, die_type: str = "d20") -> list:
+    """Feed rolls to an engine and return the matched rule names per roll."""
+    return [
+        [rule.name for rule in engine.advance(pixel_id, die_type, value)]
+        for value in rolls
+    ]
+
+
+def test_streak_of_value() -> None:
+    """Test that a streak matches once per completed run of equal values."""
+    engine = compile_patterns(
+        [{"name": "nat20", "type": "streak", "value": 20, "length": 3}]
+    )
+
+    result = _matches(engine, [20, 20, 1, 20, 20, 20, 20, 20, 20])
+
+    assert result == [[], [], [], [], [], ["nat20"], [], [], ["nat20"]]
+
+
+def test_run_below_threshold() -> None:
+    """Test a run of consecutive rolls below a threshold."""
+    engine = compile_patterns(
+        [{"name": "cold", "type": "run", "below": 5, "length": 5}]
+    )
+
+    result = _matches(engine, [1, 2, 3, 4, 5, 1, 2, 3, 4, 4])
+
+    assert result[-1] == ["cold"]
+    assert sum(bool(names) for names in result) == 1
+
+
+def test_window_sum_above() -> None:
+    """Test a sliding-window sum over the last rolls."""
+    engine = compile_patterns(
+        [{"name": "hot", "type": "window_sum", "above": 50, "length": 3}]
+    )
+
+    result = _matches(engine, [20, 20, 10, 15, 20, 20])
+
+    assert result == [[], [], [], [], [], ["hot"]]
+
+
+def test_rules_scoped_by_die_type_and_pixel_id() -> None:
+    """Test that rules only apply to their die type or pixel ID."""
+    engine = compile_patterns(
+        [
+            {"name": "d6_six", "type": "streak", "value": 6, "length": 1,
+             "die_type": "d6"},
+            {"name": "mine", "type": "streak", "value": 6, "length": 1,
+             "pixel_id": 7},
+            {"name": "any", "type": "run", "above": 0, "length": 1},
+        ]
+    )
+
+    assert _matches(engine, [6], pixel_id=1, die_type="d6") == [["d6_six", "any"]]
+    assert _matches(engine, [6], pixel_id=7, die_type="d20") == [["mine", "any"]]
+    assert _matches(engine, [6], pixel_id=2, die_type="d20") == [["any"]]
+
+
+def test_die_type_change_and_forget_reset_state() -> None:
+    """Test that matcher state restarts for a new die type or after forget."""
+    engine = compile_patterns(
+        [{"name": "ones", "type": "streak", "value": 1, "length": 2}]
+    )
+
+    assert _matches(engine, [1]) == [[]]
+    assert _matches(engine, [1], die_type="d6") == [[]]
+    engine.forget(1)
+    assert _matches(engine, [1], die_type="d6") == [[]]
+    assert _matches(engine, [1], die_type="d6") == [["ones"]]
+
+
+def test_empty_engine_is_falsy() -> None:
+    """Test that an engine without rules is skipped by the webhook."""
+    assert not compile_patterns([])
+
+
+@pytest.mark.parametrize(
+    "pattern",
+    [
+        {"name": "x", "type": "streak", "length": 3},
+        {"name": "x", "type": "run", "length": 3},
+        {"name": "x", "type": "run", "above": 1, "below": 5, "length": 3},
+        {"name": "x", "type": "window_sum", "above": 1, "length": 0},
+        {"name": "x", "type": "nope", "value": 1, "length": 3},
+    ],
+)
+def test_invalid_patterns(pattern: dict) -> None:
+    """Test that invalid pattern configurations are rejected."""
+    with pytest.raises(vol.Invalid):
+        compile_patterns([pattern])
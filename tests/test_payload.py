@@ -0,0 +1,134 @@
+"""Tests for the Pixels Dice payload decoding and validation."""
+import gzip
+import json
+import zlib
+
+import msgpack
+import pytest
+
+from custom_components.pixels_dice.payload import (
+    MAX_DECOMPRESSED_SIZE,
+    PayloadError,
+    RollRecord,
+    decode_body,
+    parse_roll,
+    parse_rolls,
+)
+
+
+def test_decode_gzip_json(sample_webhook_payload: dict) -> None:
+    """Test that gzip bodies decode to the same payload as plain JSON."""
+    body = gzip.compress(json.dumps(sample_webhook_payload).encode())
+
+    assert decode_body("application/gzip", body) == sample_webhook_payload
+
+
+@pytest.mark.parametrize("wbits", [zlib.MAX_WBITS, -zlib.MAX_WBITS])
+def test_decode_deflate_json(sample_webhook_payload: dict, wbits: int) -> None:
+    """Test that zlib-wrapped and raw deflate bodies are both accepted."""
+    compressor = zlib.compressobj(wbits=wbits)
+    body = compressor.compress(json.dumps(sample_webhook_payload).encode())
+    body += compressor.flush()
+
+    assert decode_body("application/x-deflate", body) == sample_webhook_payload
+
+
+def test_decode_msgpack(sample_webhook_payload: dict) -> None:
+    """Test that MessagePack bodies decode to the same payload as JSON."""
+    body = msgpack.packb([sample_webhook_payload, sample_webhook_payload])
+
+    assert decode_body("application/msgpack", body) == [
+        sample_webhook_payload,
+        sample_webhook_payload,
+    ]
+
+
+def test_decode_rejects_zip_bomb() -> None:
+    """Test that decompression stops at the size limit."""
+    body = gzip.compress(b" " * (MAX_DECOMPRESSED_SIZE * 8))
+
+    with pytest.raises(PayloadError) as exc_info:
+        decode_body("application/gzip", body)
+
+    assert exc_info.value.status == 413
+
+
+@pytest.mark.parametrize(
+    ("content_type", "body", "message"),
+    [
+        ("application/gzip", b"not gzip", "Invalid compressed payload"),
+        ("application/gzip", gzip.compress(b"not json"), "Invalid JSON"),
+        ("application/zlib", zlib.compress(b"{}")[:-4], "Invalid compressed payload"),
+        ("application/msgpack", b"\xc1", "Invalid MessagePack"),
+    ],
+)
+def test_decode_invalid_bodies(content_type: str, body: bytes, message: str) -> None:
+    """Test that corrupt bodies raise a 400 PayloadError."""
+    with pytest.raises(PayloadError, match=message) as exc_info:
+        decode_body(content_type, body)
+
+    assert exc_info.value.status == 400
+
+
+def test_parse_roll_applies_defaults(minimal_webhook_payload: dict) -> None:
+    """Test that a minimal event becomes a record with defaults."""
+    assert parse_roll(minimal_webhook_payload) == RollRecord(
+        pixel_id=99999999,
+        pixel_name="Unknown Dice",
+        face_value=6,
+        led_count=6,
+        die_type="d6",
+        colorway="default",
+        battery_level=0.0,
+    )
+
+
+@pytest.mark.parametrize(
+    ("led_count", "die_type"),
+    [(4, "d4"), (6, "d6"), (10, "d10"), (21, "d6pipped"), (20, "d20"), (7, "d20")],
+)
+def test_parse_roll_infers_die_type(led_count: int, die_type: str) -> None:
+    """Test that a missing dieType is inferred from ledCount."""
+    record = parse_roll({"pixelId": 1, "faceValue": 1, "ledCount": led_count})
+
+    assert record.die_type == die_type
+
+
+def test_parse_rolls_batch(
+    sample_webhook_payload: dict, minimal_webhook_payload: dict
+) -> None:
+    """Test that a list payload is validated as a batch."""
+    records = parse_rolls([sample_webhook_payload, minimal_webhook_payload])
+
+    assert [record.pixel_id for record in records] == [12345678, 99999999]
+    assert parse_rolls(sample_webhook_payload) == records[:1]
+
+
+@pytest.mark.parametrize(
+    ("data", "message"),
+    [
+        ([], "Empty batch"),
+        ("20", "Payload must be an object"),
+        ([{"pixelId": 1, "faceValue": 1, "ledCount": 6}, {}], "Missing pixelId"),
+        ({"pixelId": "abc", "faceValue": 1, "ledCount": 6}, "pixelId must be"),
+        ({"pixelId": 1.5, "faceValue": 1, "ledCount": 6}, "pixelId must be"),
+        ({"pixelId": 2**70, "faceValue": 1, "ledCount": 6}, "pixelId must be"),
+        ({"pixelId": True, "faceValue": 1, "ledCount": 6}, "pixelId must be"),
+        (
+            {"pixelId": 1, "faceValue": 1, "ledCount": 6, "dieType": ["d6"]},
+            "dieType must be a string",
+        ),
+        (
+            {"pixelId": 1, "faceValue": 1, "ledCount": 6, "pixelName": None},
+            "pixelName must be a string",
+        ),
+        (
+            {"pixelId": 1, "faceValue": 1, "ledCount": 6, "colorway": 3},
+            "colorway must be a string",
+        ),
+    ],
+)
+def test_parse_rolls_invalid(data, message: str) -> None:
+    """Test that invalid payloads and batches are rejected."""
+    with pytest.raises(PayloadError, match=message):
+        parse_rolls(data)
@@ -0,0 +1,264 @@
+"""Tests for relaying rolls between Pixels Dice instances."""
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from freezegun.api import FrozenDateTimeFactory
+
+from homeassistant import loader
+from homeassistant.core import HomeAssistant
+
+from custom_components.pixels_dice.const import (
+    DOMAIN,
+    CONF_RELAY_NODE_ID,
+    CONF_RELAY_PEERS,
+    CONF_WEBHOOK_ID,
+    DEFAULT_WEBHOOK_ID,
+    RELAY_HEADER,
+)
+from custom_components.pixels_dice.diagnostics import (
+    async_get_config_entry_diagnostics,
+)
+from custom_components.pixels_dice.payload import RollRecord
+from custom_components.pixels_dice.relay import HashRing, RollRelay
+from custom_components.pixels_dice.webhook import async_handle_webhook
+
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+    async_test_home_assistant,
+)
+from pytest_homeassistant_custom_component.test_util.aiohttp import (
+    AiohttpClientMocker,
+    AiohttpClientMockResponse,
+)
+
+URL_A = "http://table-a.local:8123/api/webhook/pixels_dice"
+URL_B = "http://table-b.local:8123/api/webhook/pixels_dice"
+
+
+def _pixel_owned_by(ring: HashRing, node: str) -> int:
+    """Return the first pixel ID the ring assigns to a node."""
+    return next(pixel_id for pixel_id in range(1000) if ring.owner(pixel_id) == node)
+
+
+def _record(pixel_id: int) -> RollRecord:
+    """Return a valid roll of a d6."""
+    return RollRecord(pixel_id, "Test D6", 6, 6, "d6", "default", 0.5)
+
+
+def _make_mock_request(payload: list[dict]):
+    """Create a mock aiohttp request for a JSON batch sent by a die."""
+    request = MagicMock()
+    request.json = AsyncMock(return_value=payload)
+    return request
+
+
+def _make_relayed_request(body: bytes, node_id: str):
+    """Create a mock aiohttp request for a batch forwarded by a peer."""
+    request = MagicMock()
+    request.content_type = "application/msgpack"
+    request.read = AsyncMock(return_value=body)
+    request.headers = {RELAY_HEADER: node_id}
+    return request
+
+
+def _relay_stats(hass: HomeAssistant, entry: MockConfigEntry) -> dict:
+    """Return the forwarding statistics of an entry's only peer."""
+    (stats,) = hass.data[DOMAIN][entry.entry_id]["relay"].stats().values()
+    return stats
+
+
+async def _setup_node(
+    hass: HomeAssistant, node_id: str, peers: dict[str, str]
+) -> MockConfigEntry:
+    """Set up the integration as one node of a relay."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_WEBHOOK_ID: DEFAULT_WEBHOOK_ID},
+        options={CONF_RELAY_NODE_ID: node_id, CONF_RELAY_PEERS: peers},
+    )
+    entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    return entry
+
+
+def test_ring_is_independent_of_node_order() -> None:
+    """Test that every node computes the same owners."""
+    ring = HashRing(["a", "b", "c"])
+    other = HashRing(["c", "a", "b"])
+
+    assert all(ring.owner(i) == other.owner(i) for i in range(2000))
+    assert {ring.owner(i) for i in range(2000)} == {"a", "b", "c"}
+
+
+def test_ring_moves_few_dice_when_a_node_is_added() -> None:
+    """Test that a new node only takes over about 1/N of the dice."""
+    before = HashRing(["a", "b", "c"])
+    after = HashRing(["a", "b", "c", "d"])
+
+    moved = [i for i in range(10_000) if before.owner(i) != after.owner(i)]
+
+    assert all(after.owner(i) == "d" for i in moved)
+    assert 1500 < len(moved) < 3500
+
+
+async def test_rolls_forwarded_to_owning_instance(
+    hass: HomeAssistant,
+    aioclient_mock: AiohttpClientMocker,
+    sample_webhook_payload: dict,
+) -> None:
+    """Test that a roll is handled by the instance owning its die."""
+    ring = HashRing(["a", "b"])
+    local_id = _pixel_owned_by(ring, "a")
+    remote_id = _pixel_owned_by(ring, "b")
+
+    async with async_test_home_assistant() as peer_hass:
+        peer_hass.data.pop(loader.DATA_CUSTOM_COMPONENTS)
+        peer_entry = await _setup_node(peer_hass, "b", {"a": URL_A})
+        entry = await _setup_node(hass, "a", {"b": URL_B})
+
+        async def _deliver(method: str, url: str, data: bytes):
+            response = await async_handle_webhook(
+                peer_hass, DOMAIN, _make_relayed_request(data, "a")
+            )
+            await peer_hass.async_block_till_done()
+            return AiohttpClientMockResponse(method, url, status=response.status)
+
+        aioclient_mock.post(URL_B, side_effect=_deliver)
+
+        response = await async_handle_webhook(
+            hass,
+            DOMAIN,
+            _make_mock_request(
+                [
+                    {**sample_webhook_payload, "pixelId": local_id},
+                    {**sample_webhook_payload, "pixelId": remote_id},
+                ]
+            ),
+        )
+        await hass.async_block_till_done()
+
+        assert response.status == 200
+        local = hass.data[DOMAIN][entry.entry_id]["entities"]
+        remote = peer_hass.data[DOMAIN][peer_entry.entry_id]["entities"]
+        assert set(local) == {local_id}
+        assert set(remote) == {remote_id}
+
+        request = aioclient_mock.mock_calls[0]
+        assert request[3][RELAY_HEADER] == "a"
+
+        stats = _relay_stats(hass, entry)
+        assert stats["forwarded"] == 1
+        assert stats["queue_depth"] == 0
+        assert stats["latency_ms"] is not None
+
+        # Batches holding only dice owned elsewhere are answered as forwarded
+        response = await async_handle_webhook(
+            hass,
+            DOMAIN,
+            _make_mock_request([{**sample_webhook_payload, "pixelId": remote_id}]),
+        )
+        assert response.text == "Forwarded"
+        await hass.async_block_till_done()
+        assert _relay_stats(hass, entry)["forwarded"] == 2
+
+        # Stopping the peer flushes its stores and cancels its timers
+        assert await peer_hass.config_entries.async_unload(peer_entry.entry_id)
+        await peer_hass.async_block_till_done()
+        await peer_hass.async_stop(force=True)
+
+
+async def test_failed_forwarding_is_retried(
+    hass: HomeAssistant,
+    aioclient_mock: AiohttpClientMocker,
+    freezer: FrozenDateTimeFactory,
+    sample_webhook_payload: dict,
+) -> None:
+    """Test that rolls stay queued while the owner is failing."""
+    remote_id = _pixel_owned_by(HashRing(["a", "b"]), "b")
+    entry = await _setup_node(hass, "a", {"b": URL_B})
+    assert hass.states.get("sensor.relay_peer_b_queue_depth").state == "0"
+
+    aioclient_mock.post(URL_B, status=500)
+    response = await async_handle_webhook(
+        hass,
+        DOMAIN,
+        _make_mock_request([{**sample_webhook_payload, "pixelId": remote_id}]),
+    )
+    await hass.async_block_till_done()
+
+    assert response.status == 200
+    assert remote_id not in hass.data[DOMAIN][entry.entry_id].get("entities", {})
+    stats = _relay_stats(hass, entry)
+    assert stats["retried"] == 1
+    assert stats["queue_depth"] == 1
+    assert stats["forwarded"] == 0
+
+    aioclient_mock.clear_requests()
+    aioclient_mock.post(URL_B, status=200)
+    freezer.tick(timedelta(seconds=31))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+    stats = _relay_stats(hass, entry)
+    assert stats["forwarded"] == 1
+    assert stats["queue_depth"] == 0
+
+    # Peer webhook URLs work like passwords and stay out of diagnostics
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+    assert diagnostics["relay"] == {"b": stats}
+    assert URL_B not in str(diagnostics)
+
+
+async def test_full_queue_drops_oldest_rolls(
+    hass: HomeAssistant, aioclient_mock: AiohttpClientMocker
+) -> None:
+    """Test that a retried batch never pushes out newer rolls."""
+    ring = HashRing(["a", "b"])
+    pixel_ids = [i for i in range(1000) if ring.owner(i) == "b"][:4]
+    with patch("custom_components.pixels_dice.relay.RELAY_MAX_QUEUE", 3):
+        relay = RollRelay(hass, "a", {"b": URL_B})
+    peer = relay.peers["b"]
+
+    async def _fail_while_more_rolls_arrive(method: str, url: str, data: bytes):
+        relay.route([_record(pixel_id) for pixel_id in pixel_ids[1:]])
+        return AiohttpClientMockResponse(method, url, status=500)
+
+    aioclient_mock.post(URL_B, side_effect=_fail_while_more_rolls_arrive)
+    assert relay.route([_record(pixel_ids[0])]) == []
+    await hass.async_block_till_done()
+
+    assert [roll["pixelId"] for roll in peer.queue] == pixel_ids[1:]
+    assert peer.stats()["dropped"] == 1
+
+    await relay.async_shutdown()
+    assert peer.stats()["dropped"] == 4
+    assert peer.stats()["queue_depth"] == 0
+
+
+async def test_shutdown_cancels_in_flight_forwarding(
+    hass: HomeAssistant, aioclient_mock: AiohttpClientMocker
+) -> None:
+    """Test that unloading stops a request in flight and counts its rolls."""
+    pixel_id = _pixel_owned_by(HashRing(["a", "b"]), "b")
+    relay = RollRelay(hass, "a", {"b": URL_B})
+    peer = relay.peers["b"]
+    hang = asyncio.Event()
+
+    async def _hang(method: str, url: str, data: bytes):
+        await hang.wait()
+
+    aioclient_mock.post(URL_B, side_effect=_hang)
+    relay.route([_record(pixel_id)])
+    await asyncio.sleep(0)
+    assert peer.flushing
+
+    await relay.async_shutdown()
+
+    assert not peer.flushing
+    assert peer.stats()["dropped"] == 1
+    assert peer.stats()["forwarded"] == 0
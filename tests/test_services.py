@@ -0,0 +1,155 @@
+"""Tests for the Pixels Dice services."""
+from __future__ import annotations
+
+import os
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ServiceValidationError
+
+from custom_components.pixels_dice.const import (
+    DOMAIN,
+    CONF_WEBHOOK_ID,
+    DEFAULT_WEBHOOK_ID,
+    SERVICE_START_SESSION,
+    SERVICE_STOP_SESSION,
+)
+from custom_components.pixels_dice.webhook import async_handle_webhook
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+
+async def _setup_integration(hass: HomeAssistant) -> MockConfigEntry:
+    """Set up the Pixels Dice integration and return the config entry."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_WEBHOOK_ID: DEFAULT_WEBHOOK_ID},
+    )
+    entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    return entry
+
+
+async def _roll(hass: HomeAssistant, payload: dict) -> None:
+    """Send a roll through the webhook handler."""
+    request = MagicMock()
+    request.json = AsyncMock(return_value=payload)
+    response = await async_handle_webhook(hass, DOMAIN, request)
+    assert response.status == 200
+
+
+async def test_session_records_rolls_and_exports(
+    hass: HomeAssistant, sample_webhook_payload: dict, tmp_path
+) -> None:
+    """Test that rolls during a session are summarized and exported."""
+    hass.config.config_dir = str(tmp_path)
+    await _setup_integration(hass)
+    pixel_id = sample_webhook_payload["pixelId"]
+
+    # Rolls outside a session are not recorded
+    await _roll(hass, sample_webhook_payload)
+
+    await hass.services.async_call(
+        DOMAIN,
+        SERVICE_START_SESSION,
+        {"name": "One-shot", "players": {"Alice": [pixel_id]}},
+        blocking=True,
+    )
+    await _roll(hass, {**sample_webhook_payload, "faceValue": 20})
+    await _roll(hass, {**sample_webhook_payload, "faceValue": 4})
+
+    summary = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_STOP_SESSION,
+        {"export": "csv"},
+        blocking=True,
+        return_response=True,
+    )
+
+    assert summary["name"] == "One-shot"
+    assert summary["rolls"] == 2
+    assert summary["players"] == [
+        {"player": "Alice", "rolls": 2, "mean": 12.0, "crit_rate": 0.5}
+    ]
+    assert summary["dice"][0]["pixel_id"] == pixel_id
+    assert os.path.dirname(summary["export_path"]) == str(tmp_path / DOMAIN)
+    with open(summary["export_path"], encoding="utf-8") as file:
+        assert len(file.readlines()) == 3
+
+
+async def test_session_service_errors(hass: HomeAssistant) -> None:
+    """Test that sessions cannot be started twice or stopped when idle."""
+    await _setup_integration(hass)
+
+    with pytest.raises(ServiceValidationError):
+        await hass.services.async_call(
+            DOMAIN, SERVICE_STOP_SESSION, {}, blocking=True, return_response=True
+        )
+
+    await hass.services.async_call(DOMAIN, SERVICE_START_SESSION, {}, blocking=True)
+    with pytest.raises(ServiceValidationError):
+        await hass.services.async_call(
+            DOMAIN, SERVICE_START_SESSION, {}, blocking=True
+        )
+
+
+async def test_session_survives_failed_export(
+    hass: HomeAssistant, sample_webhook_payload: dict, tmp_path
+) -> None:
+    """Test that a failing export never discards the recorded session."""
+    await _setup_integration(hass)
+    await hass.services.async_call(DOMAIN, SERVICE_START_SESSION, {}, blocking=True)
+    await _roll(hass, sample_webhook_payload)
+    # A file where the export directory should be makes every write fail
+    (tmp_path / "config").write_text("")
+    hass.config.config_dir = str(tmp_path / "config")
+
+    with (
+        patch("custom_components.pixels_dice.session.find_spec", return_value=None),
+        pytest.raises(ServiceValidationError, match="pyarrow"),
+    ):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_STOP_SESSION,
+            {"export": "parquet"},
+            blocking=True,
+            return_response=True,
+        )
+
+    summary = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_STOP_SESSION,
+        {"export": "csv"},
+        blocking=True,
+        return_response=True,
+    )
+
+    assert summary["rolls"] == 1
+    assert "export_path" not in summary
+    assert summary["export_error"]
+
+
+async def test_session_survives_rolls_with_invalid_names(
+    hass: HomeAssistant, sample_webhook_payload: dict
+) -> None:
+    """Test that a roll with a null name is rejected instead of recorded."""
+    await _setup_integration(hass)
+    await hass.services.async_call(DOMAIN, SERVICE_START_SESSION, {}, blocking=True)
+    await _roll(hass, sample_webhook_payload)
+
+    request = MagicMock()
+    request.json = AsyncMock(
+        return_value={**sample_webhook_payload, "pixelId": 1, "pixelName": None}
+    )
+    response = await async_handle_webhook(hass, DOMAIN, request)
+    assert response.status == 400
+
+    summary = await hass.services.async_call(
+        DOMAIN, SERVICE_STOP_SESSION, {}, blocking=True, return_response=True
+    )
+
+    assert summary["rolls"] == 1
+    assert [player["player"] for player in summary["players"]] == ["Test D20"]
@@ -0,0 +1,123 @@
+"""Tests for the Pixels Dice game-session buffer."""
+import csv
+from datetime import UTC, datetime
+
+import pytest
+
+from custom_components.pixels_dice.payload import RollRecord
+from custom_components.pixels_dice.session import RollSession
+
+
+def _roll(pixel_id: int, face_value: int, die_type: str = "d20") -> RollRecord:
+    """Build a roll record for a test die."""
+    return RollRecord(
+        pixel_id=pixel_id,
+        pixel_name=f"Die {pixel_id}",
+        face_value=face_value,
+        led_count=20,
+        die_type=die_type,
+        colorway="default",
+        battery_level=1.0,
+    )
+
+
+@pytest.fixture
+def session() -> RollSession:
+    """Return a session with a few rolls from three dice."""
+    session = RollSession(
+        "Test night", datetime(2024, 1, 1, tzinfo=UTC), players={"Alice": [1, 2]}
+    )
+    for timestamp, roll in enumerate(
+        [
+            _roll(1, 20),
+            _roll(1, 10),
+            _roll(2, 6, "d6"),
+            _roll(3, 1),
+            _roll(3, 0, "d6fudge"),
+        ]
+    ):
+        session.record(roll, 1_700_000_000.0 + timestamp)
+    return session
+
+
+def test_summary_per_die_and_player(session: RollSession) -> None:
+    """Test roll counts, means and crit rates per die and per player."""
+    summary = session.summarize()
+
+    assert summary["rolls"] == 5
+    assert summary["dice"] == [
+        {
+            "pixel_id": 1,
+            "pixel_name": "Die 1",
+            "player": "Alice",
+            "die_type": "d20",
+            "rolls": 2,
+            "mean": 15.0,
+            "crit_rate": 0.5,
+        },
+        {
+            "pixel_id": 2,
+            "pixel_name": "Die 2",
+            "player": "Alice",
+            "die_type": "d6",
+            "rolls": 1,
+            "mean": 6.0,
+            "crit_rate": 1.0,
+        },
+        {
+            "pixel_id": 3,
+            "pixel_name": "Die 3",
+            "player": "Die 3",
+            "die_type": "d6fudge",
+            "rolls": 2,
+            "mean": 0.5,
+            "crit_rate": 0.0,
+        },
+    ]
+    assert summary["players"] == [
+        {"player": "Alice", "rolls": 3, "mean": 12.0, "crit_rate": 2 / 3},
+        {"player": "Die 3", "rolls": 2, "mean": 0.5, "crit_rate": 0.0},
+    ]
+
+
+def test_summary_empty_session() -> None:
+    """Test that an empty session summarizes without errors."""
+    summary = RollSession("Empty", datetime(2024, 1, 1, tzinfo=UTC)).summarize()
+
+    assert summary["rolls"] == 0
+    assert summary["dice"] == []
+    assert summary["players"] == []
+
+
+def test_export_csv_in_chunks(session: RollSession, tmp_path) -> None:
+    """Test that a CSV export written in small chunks contains every roll."""
+    path = tmp_path / "exports" / "session.csv"
+
+    session.export(str(path), "csv", chunk_size=2)
+
+    with open(path, newline="", encoding="utf-8") as file:
+        rows = list(csv.DictReader(file))
+    assert len(rows) == 5
+    assert rows[0] == {
+        "timestamp": "2023-11-14T22:13:20+00:00",
+        "pixel_id": "1",
+        "pixel_name": "Die 1",
+        "player": "Alice",
+        "die_type": "d20",
+        "face_value": "20.0",
+    }
+    assert [row["die_type"] for row in rows] == ["d20", "d20", "d6", "d20", "d6fudge"]
+
+
+def test_export_parquet_in_chunks(session: RollSession, tmp_path) -> None:
+    """Test that a Parquet export contains every roll."""
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = tmp_path / "session.parquet"
+
+    session.export(str(path), "parquet", chunk_size=2)
+
+    table = pq.read_table(path)
+    assert table.num_rows == 5
+    assert table.column("pixel_id").to_pylist() == [1, 1, 2, 3, 3]
+    assert table.column("player").to_pylist()[:3] == ["Alice"] * 3
+    assert table.column("die_type").to_pylist()[-1] == "d6fudge"
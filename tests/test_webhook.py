@@ -1,15 +1,37 @@
 """Tests for the Pixels Dice webhook handler."""
 from __future__ import annotations
 
+from datetime import timedelta
+import gzip
 import json
 from unittest.mock import AsyncMock, MagicMock
 
-from homeassistant.core import HomeAssistant
+from freezegun.api import FrozenDateTimeFactory
+import msgpack
 
-from custom_components.pixels_dice.const import DOMAIN, CONF_WEBHOOK_ID, DEFAULT_WEBHOOK_ID
+from homeassistant.const import STATE_UNAVAILABLE
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util import dt as dt_util
+
+from custom_components.pixels_dice.const import (
+    DOMAIN,
+    CONF_MAX_LIVE_DICE,
+    CONF_PATTERNS,
+    CONF_WEBHOOK_ID,
+    DEFAULT_WEBHOOK_ID,
+    EVENT_PATTERN,
+    SERVICE_GET_BATTERY_FORECAST,
+)
+from custom_components.pixels_dice.diagnostics import (
+    async_get_config_entry_diagnostics,
+)
 from custom_components.pixels_dice.webhook import async_handle_webhook
 
-from pytest_homeassistant_custom_component.common import MockConfigEntry
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_capture_events,
+)
 
 
 def _make_mock_request(payload: dict | None = None, raw_data: bytes | None = None):
@@ -32,6 +54,22 @@ def _make_mock_request(payload: dict | None = None, raw_data: bytes | None = Non
     return request
 
 
+def _make_raw_request(content_type: str, body: bytes):
+    """Create a mock aiohttp request carrying an encoded body.
+
+    Args:
+        content_type: The request Content-Type.
+        body: The raw bytes returned by request.read().
+
+    Returns:
+        A mock request object.
+    """
+    request = MagicMock()
+    request.content_type = content_type
+    request.read = AsyncMock(return_value=body)
+    return request
+
+
 async def _setup_integration(hass: HomeAssistant) -> MockConfigEntry:
     """Set up the Pixels Dice integration and return the config entry.
 
@@ -179,6 +217,269 @@ async def test_webhook_defaults_applied(
     entity = entities[pixel_id]
 
     attrs = entity.extra_state_attributes
-    assert attrs["die_type"] == "d20"
+    # dieType is inferred from the 6 LEDs of the minimal payload
+    assert attrs["die_type"] == "d6"
     assert attrs["colorway"] == "default"
     assert attrs["battery_level"] == 0.0
+
+
+async def test_webhook_evicts_and_rehydrates_dice(
+    hass: HomeAssistant, sample_webhook_payload: dict
+) -> None:
+    """Test that dice beyond the live limit are suspended and come back."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_WEBHOOK_ID: DEFAULT_WEBHOOK_ID},
+        options={CONF_MAX_LIVE_DICE: 1},
+    )
+    entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    first_id = sample_webhook_payload["pixelId"]
+    second_payload = {**sample_webhook_payload, "pixelId": 87654321}
+
+    response = await async_handle_webhook(
+        hass, DOMAIN, _make_mock_request(sample_webhook_payload)
+    )
+    assert response.status == 200
+    await hass.async_block_till_done()
+    registry = er.async_get(hass)
+    entity_id = registry.async_get_entity_id("sensor", DOMAIN, f"{DOMAIN}_{first_id}")
+    assert hass.states.get(entity_id).state == "20"
+
+    # A second die pushes the first one out of memory
+    response = await async_handle_webhook(
+        hass, DOMAIN, _make_mock_request(second_payload)
+    )
+    assert response.status == 200
+    await hass.async_block_till_done()
+
+    entities = hass.data[DOMAIN][entry.entry_id]["entities"]
+    assert first_id not in entities
+    assert 87654321 in entities
+    assert registry.async_get(entity_id) is not None
+    assert hass.states.get(entity_id).state == STATE_UNAVAILABLE
+
+    # The next roll rehydrates it under the same entity ID
+    response = await async_handle_webhook(
+        hass, DOMAIN, _make_mock_request({**sample_webhook_payload, "faceValue": 7})
+    )
+    assert response.status == 200
+    await hass.async_block_till_done()
+
+    assert first_id in entities
+    assert 87654321 not in entities
+    assert hass.states.get(entity_id).state == "7"
+
+
+async def test_webhook_compact_encodings(
+    hass: HomeAssistant, sample_webhook_payload: dict
+) -> None:
+    """Test that gzip and MessagePack bodies are handled like JSON."""
+    entry = await _setup_integration(hass)
+    entities = hass.data[DOMAIN][entry.entry_id].setdefault("entities", {})
+    pixel_id = sample_webhook_payload["pixelId"]
+
+    body = gzip.compress(json.dumps(sample_webhook_payload).encode())
+    response = await async_handle_webhook(
+        hass, DOMAIN, _make_raw_request("application/gzip", body)
+    )
+    assert response.status == 200
+    assert entities[pixel_id]._attr_native_value == 20
+
+    body = msgpack.packb({**sample_webhook_payload, "faceValue": 3})
+    response = await async_handle_webhook(
+        hass, DOMAIN, _make_raw_request("application/msgpack", body)
+    )
+    assert response.status == 200
+    assert entities[pixel_id]._attr_native_value == 3
+
+
+async def test_webhook_batch(
+    hass: HomeAssistant, sample_webhook_payload: dict, minimal_webhook_payload: dict
+) -> None:
+    """Test that a batch of events updates every die in order."""
+    entry = await _setup_integration(hass)
+    batch = [
+        sample_webhook_payload,
+        minimal_webhook_payload,
+        {**sample_webhook_payload, "faceValue": 11},
+    ]
+
+    response = await async_handle_webhook(hass, DOMAIN, _make_mock_request(batch))
+    assert response.status == 200
+
+    entities = hass.data[DOMAIN][entry.entry_id]["entities"]
+    assert entities[sample_webhook_payload["pixelId"]]._attr_native_value == 11
+    assert entities[minimal_webhook_payload["pixelId"]]._attr_native_value == 6
+
+
+async def test_webhook_batch_rejected_atomically(
+    hass: HomeAssistant, sample_webhook_payload: dict
+) -> None:
+    """Test that one invalid event rejects the whole batch."""
+    entry = await _setup_integration(hass)
+    batch = [sample_webhook_payload, {"pixelId": 1, "faceValue": "one", "ledCount": 6}]
+
+    response = await async_handle_webhook(hass, DOMAIN, _make_mock_request(batch))
+    assert response.status == 400
+    assert "faceValue" in response.text
+    assert not hass.data[DOMAIN][entry.entry_id].get("entities")
+
+
+async def test_webhook_rejects_zip_bomb(hass: HomeAssistant) -> None:
+    """Test that oversized compressed bodies are refused."""
+    await _setup_integration(hass)
+    body = gzip.compress(b"[" + b" " * (8 * 1024 * 1024) + b"]")
+
+    response = await async_handle_webhook(
+        hass, DOMAIN, _make_raw_request("application/gzip", body)
+    )
+    assert response.status == 413
+
+
+async def test_webhook_fires_pattern_events(
+    hass: HomeAssistant, sample_webhook_payload: dict
+) -> None:
+    """Test that a matched roll pattern fires a pixels_dice_pattern event."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_WEBHOOK_ID: DEFAULT_WEBHOOK_ID},
+        options={
+            CONF_PATTERNS: [
+                {
+                    "name": "triple_nat20",
+                    "type": "streak",
+                    "value": 20,
+                    "length": 3,
+                    "die_type": "d20",
+                }
+            ]
+        },
+    )
+    entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    events = async_capture_events(hass, EVENT_PATTERN)
+
+    for _ in range(3):
+        response = await async_handle_webhook(
+            hass, DOMAIN, _make_mock_request(sample_webhook_payload)
+        )
+        assert response.status == 200
+    await hass.async_block_till_done()
+
+    assert len(events) == 1
+    assert events[0].data == {
+        "pattern": "triple_nat20",
+        "pixel_id": sample_webhook_payload["pixelId"],
+        "pixel_name": sample_webhook_payload["pixelName"],
+        "die_type": "d20",
+        "face_value": 20,
+    }
+
+
+async def test_webhook_battery_forecast(
+    hass: HomeAssistant,
+    freezer: FrozenDateTimeFactory,
+    sample_webhook_payload: dict,
+) -> None:
+    """Test that a draining battery produces a forecast sensor and ranking."""
+    await _setup_integration(hass)
+    pixel_id = sample_webhook_payload["pixelId"]
+    start = dt_util.utcnow()
+
+    # 1% per hour from 85%: empty 85 hours after the first roll
+    for hour in range(5):
+        payload = {**sample_webhook_payload, "batteryLevel": 0.85 - hour * 0.01}
+        response = await async_handle_webhook(hass, DOMAIN, _make_mock_request(payload))
+        assert response.status == 200
+        freezer.tick(timedelta(hours=1))
+    await hass.async_block_till_done()
+
+    registry = er.async_get(hass)
+    entity_id = registry.async_get_entity_id(
+        "sensor", DOMAIN, f"{DOMAIN}_{pixel_id}_battery_empty_at"
+    )
+    expected = start + timedelta(hours=85)
+    state = dt_util.parse_datetime(hass.states.get(entity_id).state)
+    assert abs(state - expected) <= timedelta(minutes=1)
+
+    response = await hass.services.async_call(
+        DOMAIN, SERVICE_GET_BATTERY_FORECAST, {}, blocking=True, return_response=True
+    )
+    [die] = response["dice"]
+    assert die["pixel_id"] == pixel_id
+    assert die["entity_id"] == entity_id
+    assert abs(dt_util.parse_datetime(die["empty_at"]) - expected) < timedelta(
+        seconds=1
+    )
+
+
+async def test_webhook_rejects_impossible_rolls(
+    hass: HomeAssistant, sample_webhook_payload: dict
+) -> None:
+    """Test that out-of-range rolls are dropped and counted per die."""
+    entry = await _setup_integration(hass)
+    pixel_id = sample_webhook_payload["pixelId"]
+    d6_payload = {**sample_webhook_payload, "dieType": "d6", "ledCount": 6}
+
+    # A 37 on a d6 is rejected without creating the die
+    response = await async_handle_webhook(
+        hass, DOMAIN, _make_mock_request({**d6_payload, "faceValue": 37})
+    )
+    assert response.status == 400
+    assert "out of range" in response.text
+    assert pixel_id not in hass.data[DOMAIN][entry.entry_id].get("entities", {})
+
+    # In a batch only the impossible roll is dropped
+    batch = [
+        {**d6_payload, "faceValue": 4},
+        {**d6_payload, "faceValue": 0},
+        {**d6_payload, "faceValue": 5, "ledCount": 21},
+    ]
+    response = await async_handle_webhook(hass, DOMAIN, _make_mock_request(batch))
+    assert response.status == 200
+
+    entity = hass.data[DOMAIN][entry.entry_id]["entities"][pixel_id]
+    assert entity._attr_native_value == 5
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+    assert diagnostics["roll_issues"] == {
+        str(pixel_id): {"face_out_of_range": 2, "led_count_mismatch": 1}
+    }
+    assert diagnostics["live_dice"] == 1
+
+
+async def test_evicted_dice_drop_roll_issues(
+    hass: HomeAssistant, sample_webhook_payload: dict
+) -> None:
+    """Test that roll issue counts are evicted with their die."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_WEBHOOK_ID: DEFAULT_WEBHOOK_ID},
+        options={CONF_MAX_LIVE_DICE: 1},
+    )
+    entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    # A die sending nothing but impossible rolls still counts as live
+    response = await async_handle_webhook(
+        hass,
+        DOMAIN,
+        _make_mock_request({**sample_webhook_payload, "pixelId": 1, "faceValue": 37}),
+    )
+    assert response.status == 400
+    assert 1 in hass.data[DOMAIN][entry.entry_id]["roll_issues"]
+
+    response = await async_handle_webhook(
+        hass, DOMAIN, _make_mock_request(sample_webhook_payload)
+    )
+    assert response.status == 200
+    await hass.async_block_till_done()
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+    assert diagnostics["roll_issues"] == {}
+    assert diagnostics["live_dice"] == 1